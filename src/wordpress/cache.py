@@ -0,0 +1,229 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class BaseCache(ABC):
+    """
+    WordPressデータ（ユーザー、カテゴリ、タグ、投稿など）の読み取りキャッシュの基底クラス
+    キーはnamespaceごとに管理され、値はJSONシリアライズ可能なオブジェクトとする。
+    """
+
+    @abstractmethod
+    async def get_many(self, namespace: str, keys: list[Any]) -> dict[str, Any]:
+        """
+        指定キーの値を一括取得する（存在しない、または期限切れのキーは結果に含まれない）
+
+        Args:
+            namespace (str): キャッシュの名前空間（例: 'users', 'categories'）
+            keys (list): 取得したいキーのリスト
+
+        Returns:
+            dict[str, Any]: 文字列化したキーと値の辞書
+        """
+
+    @abstractmethod
+    async def set_many(self, namespace: str, items: dict[Any, Any], ttl: float | None = None) -> None:
+        """
+        複数の値を一括保存する
+
+        Args:
+            namespace (str): キャッシュの名前空間
+            items (dict): キーと値の辞書
+            ttl (float, optional): 有効期間（秒）。Noneの場合は無期限。
+        """
+
+    @abstractmethod
+    async def add(self, namespace: str, key: Any, value: Any, ttl: float | None = None) -> bool:
+        """
+        値が存在しない（または期限切れの）場合のみ保存する（複数ワーカー間のロックに使う）
+
+        Args:
+            namespace (str): キャッシュの名前空間
+            key (Any): キー
+            value (Any): 保存する値
+            ttl (float, optional): 有効期間（秒）。Noneの場合は無期限。
+
+        Returns:
+            bool: 保存した場合はTrue、既に値が存在した場合はFalse
+        """
+
+    @abstractmethod
+    async def delete(self, namespace: str, key: Any) -> None:
+        """
+        指定キーの値を削除する
+
+        Args:
+            namespace (str): キャッシュの名前空間
+            key (Any): 削除したいキー
+        """
+
+    async def get(self, namespace: str, key: Any) -> Any | None:
+        """
+        指定キーの値を取得する
+
+        Args:
+            namespace (str): キャッシュの名前空間
+            key (Any): 取得したいキー
+
+        Returns:
+            Any | None: キャッシュされた値、存在しない場合はNone
+        """
+        return (await self.get_many(namespace, [key])).get(str(key))
+
+    async def set(self, namespace: str, key: Any, value: Any, ttl: float | None = None) -> None:
+        """
+        値を保存する
+
+        Args:
+            namespace (str): キャッシュの名前空間
+            key (Any): キー
+            value (Any): 保存する値
+            ttl (float, optional): 有効期間（秒）。Noneの場合は無期限。
+        """
+        await self.set_many(namespace, {key: value}, ttl=ttl)
+
+
+class InMemoryCache(BaseCache):
+    """
+    プロセス内の辞書で保持するキャッシュ（シングルプロセス運用時のデフォルト）
+    """
+
+    def __init__(self):
+        self._store: dict[tuple[str, str], tuple[float | None, Any]] = {}
+
+    async def get_many(self, namespace: str, keys: list[Any]) -> dict[str, Any]:
+        now = time.time()
+        result = {}
+        for key in map(str, keys):
+            entry = self._store.get((namespace, key))
+            if entry is None:
+                continue
+            expires_at, value = entry
+            if expires_at is not None and expires_at < now:
+                del self._store[(namespace, key)]
+                continue
+            result[key] = value
+        return result
+
+    async def set_many(self, namespace: str, items: dict[Any, Any], ttl: float | None = None) -> None:
+        expires_at = time.time() + ttl if ttl is not None else None
+        for key, value in items.items():
+            self._store[(namespace, str(key))] = (expires_at, value)
+
+    async def add(self, namespace: str, key: Any, value: Any, ttl: float | None = None) -> bool:
+        if await self.get(namespace, key) is not None:
+            return False
+        await self.set(namespace, key, value, ttl=ttl)
+        return True
+
+    async def delete(self, namespace: str, key: Any) -> None:
+        self._store.pop((namespace, str(key)), None)
+
+
+class SQLiteCache(BaseCache):
+    """
+    ローカルのSQLiteファイルで保持するキャッシュ
+    WALモードで開くため、同一ホスト上の複数ワーカープロセスから同じキャッシュを共有できる。
+    下書きや非公開の投稿本文も保存されるため、ファイルは所有者のみ読み書きできる権限（0600）で作成する。
+    SQLiteへのアクセスはスレッドで実行し、イベントループをブロックしない。
+    """
+
+    def __init__(self, path: str | Path):
+        """
+        Args:
+            path (str | Path): SQLiteデータベースファイルのパス
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._pid: int | None = None
+
+    def _connection(self) -> sqlite3.Connection:
+        # fork後に親プロセスの接続を使い回さないよう、プロセスごとに接続を開き直す
+        if self._conn is None or self._pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # SQLiteはWAL・共有メモリファイルをデータベースファイルと同じ権限で作成する
+            os.close(os.open(self.path, os.O_CREAT | os.O_WRONLY, 0o600))
+            if self.path.stat().st_mode & 0o077:
+                os.chmod(self.path, 0o600)
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS cache ('
+                'namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, expires_at REAL, '
+                'PRIMARY KEY (namespace, key))'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at)')
+            self._conn = conn
+            self._pid = os.getpid()
+            logger.info(f'Opened SQLite cache at {self.path}')
+        return self._conn
+
+    def _get_many(self, namespace: str, keys: list[str]) -> dict[str, Any]:
+        with self._lock:
+            placeholders = ','.join('?' * len(keys))
+            rows = self._connection().execute(
+                f'SELECT key, value FROM cache WHERE namespace = ? AND key IN ({placeholders}) '  # noqa: S608
+                'AND (expires_at IS NULL OR expires_at >= ?)',
+                [namespace, *keys, time.time()],
+            )
+            return {key: json.loads(value) for key, value in rows}
+
+    def _set_many(self, namespace: str, items: dict[str, str], expires_at: float | None) -> None:
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute('BEGIN')
+                conn.executemany(
+                    'INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)',
+                    [(namespace, key, value, expires_at) for key, value in items.items()],
+                )
+                conn.execute('DELETE FROM cache WHERE expires_at < ?', (time.time(),))
+
+    def _add(self, namespace: str, key: str, value: str, expires_at: float | None) -> bool:
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                # 期限切れの値の削除と挿入を1つの書き込みトランザクションで行い、他のプロセスと競合しないようにする
+                conn.execute('BEGIN IMMEDIATE')
+                conn.execute('DELETE FROM cache WHERE namespace = ? AND key = ? AND expires_at < ?', (namespace, key, time.time()))
+                cursor = conn.execute(
+                    'INSERT OR IGNORE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)',
+                    (namespace, key, value, expires_at),
+                )
+                return cursor.rowcount == 1
+
+    def _delete(self, namespace: str, key: str) -> None:
+        with self._lock:
+            self._connection().execute('DELETE FROM cache WHERE namespace = ? AND key = ?', (namespace, key))
+
+    async def get_many(self, namespace: str, keys: list[Any]) -> dict[str, Any]:
+        if not keys:
+            return {}
+        return await asyncio.to_thread(self._get_many, namespace, [str(key) for key in keys])
+
+    async def set_many(self, namespace: str, items: dict[Any, Any], ttl: float | None = None) -> None:
+        if not items:
+            return
+        expires_at = time.time() + ttl if ttl is not None else None
+        serialized = {str(key): json.dumps(value, ensure_ascii=False) for key, value in items.items()}
+        await asyncio.to_thread(self._set_many, namespace, serialized, expires_at)
+
+    async def add(self, namespace: str, key: Any, value: Any, ttl: float | None = None) -> bool:
+        expires_at = time.time() + ttl if ttl is not None else None
+        return await asyncio.to_thread(self._add, namespace, str(key), json.dumps(value, ensure_ascii=False), expires_at)
+
+    async def delete(self, namespace: str, key: Any) -> None:
+        await asyncio.to_thread(self._delete, namespace, str(key))
@@ -0,0 +1,64 @@
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Generator
+
+_deadline: ContextVar[float | None] = ContextVar('wp_request_deadline', default=None)
+
+
+@contextmanager
+def deadline(timeout: float | None) -> Generator[None, None, None]:
+    """
+    現在のコンテキスト（およびそこから生成されるタスク）にリクエストの期限を設定する
+    期限が既に設定されている場合は、より早い方の期限が有効になる。
+
+    Args:
+        timeout (float | None): 現在からの猶予時間（秒）。Noneの場合は期限を変更しない。
+
+    Yields:
+        None
+    """
+    if timeout is None:
+        yield
+        return
+
+    current = _deadline.get()
+    new_deadline = time.monotonic() + timeout
+    token = _deadline.set(new_deadline if current is None else min(current, new_deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time() -> float | None:
+    """
+    現在のコンテキストの期限までの残り時間を取得する
+
+    Returns:
+        float | None: 残り時間（秒）。期限が設定されていない場合はNone。
+    """
+    current = _deadline.get()
+    return None if current is None else current - time.monotonic()
+
+
+async def gather_or_cancel(*aws: Awaitable[Any]) -> list[Any]:
+    """
+    asyncio.gatherと同様に並行実行するが、いずれかが失敗した時点で残りのタスクをキャンセルする
+    呼び出し元がキャンセルされた場合も、全てのタスクのキャンセル完了を待ってから例外を送出する。
+
+    Args:
+        *aws (Awaitable): 並行実行するAwaitable
+
+    Returns:
+        list: 引数と同じ順序の結果のリスト
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
@@ -0,0 +1,361 @@
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator, Literal
+
+import click
+
+from src.config.env_config import env_config
+from src.utils.logger import get_logger
+from src.wordpress.cache import InMemoryCache
+from src.wordpress.deadline import gather_or_cancel
+from src.wordpress.html_text import HtmlEngine, get_html_converter
+from src.wordpress.schemas import ExportPostsResult, PostListQueryParams, PostSchema
+from src.wordpress.tools.tool_manager import WordPressToolManager
+from src.wordpress.warmup import TermCacheWarmer
+from src.wordpress.wp_client import get_wordpress_client
+
+logger = get_logger(__name__)
+
+ExportFormat = Literal['jsonl', 'parquet']
+
+_END = object()
+
+
+class PostExporter:
+    def __init__(
+        self,
+        tool_manager: WordPressToolManager,
+        output_path: str | Path,
+        format: ExportFormat = 'jsonl',
+        params: PostListQueryParams | dict[str, Any] | None = None,
+        batch_size: int = 100,
+        prefetch: int = 4,
+        rows_per_file: int = 10000,
+    ):
+        """
+        サイト全体の投稿をJSONLまたはParquetにストリーミングで書き出すエクスポーター
+
+        投稿IDを昇順に取得し、batch_size件ずつ「取得 → 変換（作成者・ターム解決、HTMLのテキスト化） → 書き込み」の
+        パイプラインで処理する。各段の間のキューは上限付きなので、投稿数に関係なくメモリ使用量は一定になる。
+        書き出しはID順に行うため、中断しても最後に書き出したIDの次から再開できる。
+
+        Args:
+            tool_manager (WordPressToolManager): 投稿の取得と変換に使うツールマネージャー
+            output_path (str | Path): 出力先。jsonlの場合はファイル、parquetの場合はディレクトリ。
+            format (ExportFormat, optional): 出力形式（'jsonl' または 'parquet'）. Defaults to 'jsonl'.
+            params (PostListQueryParams | dict, optional): 対象投稿の絞り込み条件（ページング・並び順は無視される）. Defaults to None.
+            batch_size (int, optional): 1回のリクエストで取得する投稿数（1〜100、WordPressのper_pageの上限）. Defaults to 100.
+            prefetch (int, optional): 先読みするバッチ数. Defaults to 4.
+            rows_per_file (int, optional): parquetの1ファイルあたりの最大行数. Defaults to 10000.
+        """
+        if not 1 <= batch_size <= 100:
+            raise ValueError(f'batch_size must be between 1 and 100 (got {batch_size}).')
+        self.tool_manager = tool_manager
+        self.output_path = Path(output_path)
+        self.format = format
+        if isinstance(params, dict):
+            params = PostListQueryParams.model_validate(params)
+        self.params = params or PostListQueryParams()
+        self.batch_size = batch_size
+        self.prefetch = prefetch
+        self.rows_per_file = rows_per_file
+        self._id_page_size = 100
+
+    async def export(self, resume: bool = True) -> ExportPostsResult:
+        """
+        投稿を書き出します。
+
+        Args:
+            resume (bool, optional): 既存の出力があれば、最後に書き出したIDの次から再開するかどうか. Defaults to True.
+
+        Returns:
+            ExportPostsResult: エクスポート結果
+        """
+        started = time.monotonic()
+        writer = _JsonlWriter(self.output_path) if self.format == 'jsonl' else _ParquetWriter(self.output_path, self.rows_per_file)
+        last_id = writer.open(resume=resume)
+        logger.info(f'Exporting posts to {self.output_path} ({self.format}), resuming after ID {last_id}')
+
+        fetched: asyncio.Queue = asyncio.Queue(maxsize=self.prefetch)
+        converted: asyncio.Queue = asyncio.Queue(maxsize=self.prefetch)
+        result = {'count': 0, 'last_id': last_id}
+
+        async def fetch_stage():
+            async for ids in self._iter_id_batches(after_id=last_id):
+                await fetched.put(asyncio.create_task(self._fetch_batch(ids)))
+            await fetched.put(_END)
+
+        async def convert_stage():
+            while (task := await fetched.get()) is not _END:
+                await converted.put(await self.tool_manager.parse_posts(await task))
+            await converted.put(_END)
+
+        async def write_stage():
+            while (rows := await converted.get()) is not _END:
+                if not rows:
+                    continue
+                await asyncio.to_thread(writer.write, rows)
+                result['count'] += len(rows)
+                result['last_id'] = rows[-1].id
+                logger.info(f'Exported {result["count"]} posts (last ID {result["last_id"]})')
+
+        try:
+            await gather_or_cancel(fetch_stage(), convert_stage(), write_stage())
+        finally:
+            while not fetched.empty():
+                task = fetched.get_nowait()
+                if isinstance(task, asyncio.Task):
+                    task.cancel()
+            await asyncio.to_thread(writer.close)
+
+        return ExportPostsResult(
+            path=str(self.output_path),
+            format=self.format,
+            count=result['count'],
+            last_id=result['last_id'],
+            elapsed_seconds=round(time.monotonic() - started, 3),
+        )
+
+    def _query_params(self) -> dict[str, Any]:
+        """
+        絞り込み条件をREST APIのクエリパラメータに変換します（ページングと並び順は除外）。
+
+        Returns:
+            dict: クエリパラメータ
+        """
+        params = self.params.model_dump(mode='json', exclude_none=True, exclude={'page', 'per_page', 'orderby', 'order'})
+        return {key: ','.join(map(str, value)) if isinstance(value, list) else value for key, value in params.items()}
+
+    async def _iter_id_batches(self, after_id: int) -> AsyncIterator[list[int]]:
+        """
+        IDのみの軽量な一覧をID昇順にページングし、after_idより大きいIDをbatch_size件ずつ返します。
+        再開時は1ページ目から読み直さず、after_idを含むページから読み始めます。
+
+        Args:
+            after_id (int): このIDより大きい投稿のみを対象にする
+
+        Yields:
+            list[int]: 投稿IDのリスト
+        """
+        params = {**self._query_params(), '_fields': 'id', 'orderby': 'id', 'order': 'asc'}
+        start_page = await self._find_start_page(params, after_id) if after_id else 1
+        batch: list[int] = []
+        pages = self.tool_manager.client.wp_iter_pages(
+            'posts', params, per_page=self._id_page_size, max_concurrency=self.prefetch, start_page=start_page
+        )
+        async for page in pages:
+            batch.extend(post['id'] for post in page if post['id'] > after_id)
+            while len(batch) >= self.batch_size:
+                yield batch[: self.batch_size]
+                batch = batch[self.batch_size :]
+        if batch:
+            yield batch
+
+    async def _find_start_page(self, params: dict[str, Any], after_id: int) -> int:
+        """
+        ID昇順の一覧を二分探索し、after_idより大きいIDを含む最初のページを求めます（約log2(総ページ数)回のリクエスト）。
+        探索中に投稿が削除されてページがずれても取りこぼさないよう、1ページ手前から読み始めます。
+
+        Args:
+            params (dict): ID一覧のクエリパラメータ
+            after_id (int): 書き出し済みの最後の投稿ID
+
+        Returns:
+            int: 読み始めるページ番号
+        """
+        client = self.tool_manager.client
+        _, total_pages = await client.wp_fetch_page('posts', params, page=1, per_page=self._id_page_size)
+        low, high = 1, total_pages
+        while low < high:
+            middle = (low + high) // 2
+            items, _ = await client.wp_fetch_page('posts', params, page=middle, per_page=self._id_page_size)
+            if items and items[-1]['id'] > after_id:
+                high = middle
+            else:
+                low = middle + 1
+        logger.info(f'Resuming ID listing from page {max(1, low - 1)} of {total_pages}')
+        return max(1, low - 1)
+
+    async def _fetch_batch(self, ids: list[int]) -> list[dict[str, Any]]:
+        """
+        指定IDの投稿本文を1回のリクエストで取得します。
+
+        Args:
+            ids (list[int]): 投稿IDのリスト
+
+        Returns:
+            list[dict]: ID昇順の投稿データのリスト
+        """
+        params = {**self._query_params(), 'include': ','.join(map(str, ids)), 'per_page': len(ids), 'orderby': 'id', 'order': 'asc'}
+        return await self.tool_manager.client.wp_fetch_posts(params=params)
+
+
+class _JsonlWriter:
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = None
+
+    def open(self, resume: bool) -> int:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        last_id = self._last_exported_id() if resume and self.path.exists() else 0
+        self._file = self.path.open('a' if last_id else 'w', encoding='utf-8')
+        return last_id
+
+    def _last_exported_id(self) -> int:
+        with self.path.open('rb+') as f:
+            position = f.seek(0, 2)
+            tail = b''
+            while position > 0 and tail.count(b'\n') < 2:
+                step = min(64 * 1024, position)
+                position -= step
+                f.seek(position)
+                tail = f.read(step) + tail
+            # 書き込み途中で中断した末尾の不完全な行は切り詰める
+            complete = tail[: tail.rfind(b'\n') + 1]
+            if len(complete) < len(tail):
+                f.truncate(position + len(complete))
+            last_line = complete.rstrip(b'\n').rsplit(b'\n', 1)[-1]
+            return json.loads(last_line)['id'] if last_line else 0
+
+    def write(self, rows: list[PostSchema]):
+        self._file.write(''.join(row.model_dump_json() + '\n' for row in rows))
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class _ParquetWriter:
+    def __init__(self, path: Path, rows_per_file: int):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Parquet export requires pyarrow. Install it with 'pip install rewrite-agent-demo[export]'.") from e
+        self._pa = pa
+        self._pq = pq
+        self.path = path
+        self.rows_per_file = rows_per_file
+        self.schema = pa.schema(
+            [
+                ('id', pa.int64()),
+                ('slug', pa.string()),
+                ('title', pa.string()),
+                ('author', pa.struct([('id', pa.int64()), ('name', pa.string())])),
+                ('date', pa.timestamp('us')),
+                ('categories', pa.list_(pa.string())),
+                ('tags', pa.list_(pa.string())),
+                ('content', pa.string()),
+                ('excerpt', pa.string()),
+                ('url', pa.string()),
+                ('status', pa.string()),
+            ]
+        )
+        self._writer = None
+        self._part_path: Path | None = None
+        self._part_rows = 0
+        self._next_part = 0
+
+    def open(self, resume: bool) -> int:
+        self.path.mkdir(parents=True, exist_ok=True)
+        # 書き込み途中で中断したファイルはフッターが無く読めないため削除する
+        for tmp in self.path.glob('*.parquet.tmp'):
+            tmp.unlink()
+        parts = sorted(self.path.glob('part-*.parquet'))
+        if not resume:
+            for part in parts:
+                part.unlink()
+            return 0
+        self._next_part = len(parts)
+        last_id = 0
+        for part in parts:
+            ids = self._pq.read_table(part, columns=['id']).column('id')
+            if len(ids):
+                last_id = max(last_id, self._pa.compute.max(ids).as_py())
+        return last_id
+
+    def write(self, rows: list[PostSchema]):
+        if self._writer is None:
+            self._part_path = self.path / f'part-{self._next_part:05d}.parquet'
+            self._writer = self._pq.ParquetWriter(f'{self._part_path}.tmp', self.schema)
+            self._next_part += 1
+        self._writer.write_table(self._pa.Table.from_pylist([row.model_dump() for row in rows], schema=self.schema))
+        self._part_rows += len(rows)
+        if self._part_rows >= self.rows_per_file:
+            self.close()
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            Path(f'{self._part_path}.tmp').rename(self._part_path)
+            self._writer = None
+            self._part_rows = 0
+
+
+@click.command()
+@click.option('--output', required=True, help='出力先（jsonlの場合はファイル、parquetの場合はディレクトリ）')
+@click.option('--format', 'format_', default='jsonl', type=click.Choice(['jsonl', 'parquet']), help='出力形式（デフォルト: jsonl）')
+@click.option('--status', default='publish', help='対象とする投稿ステータス（カンマ区切り、デフォルト: publish）')
+@click.option(
+    '--batch-size', default=100, type=click.IntRange(1, 100), help='1回のリクエストで取得する投稿数（最大100、デフォルト: 100）'
+)
+@click.option('--prefetch', default=4, help='先読みするバッチ数（デフォルト: 4）')
+@click.option('--resume/--no-resume', default=True, help='既存の出力の続きから再開するかどうか')
+@click.option(
+    '--html-engine',
+    default='auto',
+    type=click.Choice(['auto', 'lxml', 'html2text']),
+    help='HTML→テキスト変換エンジン（デフォルト: auto）',
+)
+@click.option('--url', default=env_config.WP_BASE_URL, help='WordPressサイトのベースURL（例: https://example.com）')
+@click.option('--username', default=env_config.WP_USERNAME, help='WordPressのユーザー名')
+@click.option('--app-password', default=env_config.WP_APP_PASSWORD, help='WordPressのアプリパスワード')
+def start_export(
+    output: str,
+    format_: ExportFormat,
+    status: str,
+    batch_size: int,
+    prefetch: int,
+    resume: bool,
+    html_engine: HtmlEngine,
+    url: str,
+    username: str,
+    app_password: str,
+):
+    """
+    サイト全体の投稿をJSONLまたはParquetに書き出します。
+
+    Args:
+        output (str): 出力先
+        format_ (ExportFormat): 出力形式
+        status (str): 対象とする投稿ステータス
+        batch_size (int): 1回のリクエストで取得する投稿数
+        prefetch (int): 先読みするバッチ数
+        resume (bool): 既存の出力の続きから再開するかどうか
+        html_engine (HtmlEngine): HTML→テキスト変換エンジン
+        url (str): WordPressサイトのベースURL
+        username (str): WordPressのユーザー名
+        app_password (str): WordPressのアプリパスワード
+    """
+
+    async def run() -> ExportPostsResult:
+        async with get_wordpress_client(base_url=url, username=username, app_password=app_password) as wp_client:
+            cache = InMemoryCache()
+            # 投稿ごとの作成者・ターム解決がリクエストにならないよう、先に一括で読み込んでおく
+            await TermCacheWarmer(client=wp_client, cache=cache).warm(force=True)
+            exporter = PostExporter(
+                tool_manager=WordPressToolManager(client=wp_client, cache=cache, html_converter=get_html_converter(html_engine)),
+                output_path=output,
+                format=format_,
+                params=PostListQueryParams(status=status.split(',')),
+                batch_size=batch_size,
+                prefetch=prefetch,
+            )
+            return await exporter.export(resume=resume)
+
+    result = asyncio.run(run())
+    click.echo(result.model_dump_json())
@@ -0,0 +1,608 @@
+import re
+import string
+import threading
+import time
+from abc import ABC, abstractmethod
+from html.entities import name2codepoint
+from pathlib import Path
+from typing import Any, Literal
+
+import click
+import html2text
+from html2text import config as html2text_config
+from html2text.utils import escape_md, escape_md_section
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+HtmlEngine = Literal['auto', 'lxml', 'html2text']
+
+# html2textは文字参照を独立したテキスト片として扱い（エスケープしない）、&rsquo; などはASCIIに置き換える。
+# 解析後も文字参照の位置が分かるよう、私用領域の文字で囲んでからlxmlに渡す。
+_REF_START, _REF_END, _NBSP_REF = '\ue000', '\ue001', '\ue002'
+_NBSP_PLACEHOLDER = '&nbsp_place_holder;'
+_CHAR_REF = re.compile(r'&(?:#[xX][0-9a-fA-F]+|#\d+|[A-Za-z][A-Za-z0-9]*);')
+_MARKED_REF = re.compile(f'{_REF_START}(.*?){_REF_END}', re.DOTALL)
+_UNIFIABLE_CHARS = {chr(name2codepoint[name]): value for name, value in html2text_config.UNIFIABLE.items() if name != 'nbsp'} | {
+    _NBSP_REF: _NBSP_PLACEHOLDER
+}
+_WHITESPACE = re.compile(r'\s+')
+# lxmlは文字列の先頭にエンコーディング宣言があると解析できないため取り除く（html2textは処理命令として無視する）
+_XML_DECLARATION = re.compile(r'^(\s*)<\?xml\b[^>]*\?>', re.IGNORECASE)
+# escape_md_sectionが書き換える可能性のあるテキスト片（バックスラッシュ、または先頭が番号・+・-）
+_MAY_NEED_ESCAPE = re.compile(r'\s*(?:\d+\.|[-+])|.*\\', re.DOTALL)
+_ABSOLUTE_URL = re.compile(r'^[a-zA-Z+]+://')
+_NOT_STRESS_BOUNDARY = re.compile(r'[^][(){}\s.!?]')
+_HEADINGS = {'h1': 1, 'h2': 2, 'h3': 3, 'h4': 4, 'h5': 5, 'h6': 6}
+_SKIPPED_TAGS = {'head', 'style', 'script'}
+_BLOCK_LINK_TAGS = {'p', 'div', 'style', 'dl', 'dt'}
+_HANDLED_TAGS = {
+    *_HEADINGS,
+    *('p', 'div', 'br', 'hr', 'blockquote', 'em', 'i', 'u', 'strong', 'b', 'del', 'strike', 's', 'kbd', 'code', 'tt', 'q'),
+    *('a', 'img', 'dl', 'dt', 'dd', 'li', 'table', 'tr', 'td', 'th', 'pre', 'ol', 'ul'),
+}
+
+
+class BaseHtmlConverter(ABC):
+    """
+    WordPressのレンダリング済みHTMLをMarkdown形式のテキストに変換するエンジンの基底クラス
+    どのエンジンもhtml2text（折り返しなし）と同じ記法で出力する。
+    html2text.html2textの既定の78文字での折り返しは、日本語の文や長いURLの途中に改行を入れてしまうため、
+    エンジンに関係なく行わない（ツールの出力は段落ごとに1行になる）。
+    """
+
+    name: str
+
+    @abstractmethod
+    def convert(self, html_text: str) -> str:
+        """
+        HTMLをテキストに変換する
+
+        Args:
+            html_text (str): 変換するHTML
+
+        Returns:
+            str: 前後の空白を除いたMarkdown形式のテキスト
+        """
+
+
+class Html2TextConverter(BaseHtmlConverter):
+    """
+    html2text（純Python実装）による変換エンジン
+    追加の依存なしで動作するため、lxmlがインストールされていない環境でのフォールバックとして使う。
+    """
+
+    name = 'html2text'
+
+    def convert(self, html_text: str) -> str:
+        parser = html2text.HTML2Text()
+        parser.body_width = 0
+        return parser.handle(html_text).strip()
+
+
+class LxmlHtmlConverter(BaseHtmlConverter):
+    """
+    lxml（libxml2）でHTMLを解析し、html2textと同じ規則でMarkdownを組み立てる変換エンジン
+    HTMLの字句解析をCで行い、要素ツリーを作らずにパーサーのイベントから直接出力するため、
+    投稿本文のような長いHTMLほどhtml2textより高速になる。
+
+    libxml2がHTMLの構造を補正するため、次の場合はhtml2textと出力が異なる（WordPressの投稿本文では通常発生しない）。
+        - <head>の外にある<title>: libxml2が<head>内に移すため出力されない（html2textは本文として出力する）
+        - 閉じられていない、または入れ子が正しくないインライン要素: libxml2が補った終了タグの記法（**や_）も出力される
+    """
+
+    name = 'lxml'
+
+    def __init__(self):
+        try:
+            from lxml import etree
+        except ImportError as e:
+            raise ImportError("The lxml engine requires lxml. Install it with 'pip install rewrite-agent-demo[html]'.") from e
+        self._etree = etree
+        # パーサーはスレッド間で共有できないため、スレッドごとに作って使い回す
+        self._local = threading.local()
+
+    def convert(self, html_text: str) -> str:
+        if '&' in html_text:
+            html_text = _CHAR_REF.sub(_mark_char_ref, html_text)
+        if not html_text.strip():
+            return ''
+        if '<?' in html_text:
+            html_text = _XML_DECLARATION.sub(r'\1', html_text, count=1)
+        if not hasattr(self._local, 'parser'):
+            self._local.writer = _MarkdownWriter()
+            self._local.parser = self._etree.HTMLParser(target=self._local.writer, remove_comments=True, remove_pis=True)
+        # 前回の変換が例外で中断していても状態が残らないよう、毎回初期化する
+        self._local.writer.reset()
+        return self._etree.fromstring(html_text, self._local.parser).replace(_NBSP_PLACEHOLDER, ' ').strip()
+
+
+def _mark_char_ref(match: re.Match[str]) -> str:
+    ref = match.group()
+    return _REF_START + (_NBSP_REF if ref == '&nbsp;' else ref) + _REF_END
+
+
+def _attr(attrs: Any, name: str) -> str | None:
+    value = attrs.get(name)
+    if value is not None and _REF_START in value:
+        value = value.replace(_REF_START, '').replace(_REF_END, '').replace(_NBSP_REF, '\xa0')
+    return value
+
+
+class _ListState:
+    def __init__(self, name: str, start: str | None):
+        self.name = name
+        try:
+            self.num = int(start) - 1 if start is not None else 0
+        except ValueError:
+            self.num = 0
+
+
+class _MarkdownWriter:
+    """
+    lxmlのパーサーターゲットとしてイベントを受け取り、html2textのHTML2Text.handleと同じ出力を組み立てる
+    空白・改行の扱い（p_p, space, start）はhtml2textの実装に合わせている。
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.out: list[str] = []
+        self.p_p = 0
+        self.at_start = True
+        self.space = False
+        self.br_toggle = ''
+        self.blockquote = 0
+        self.pre = False
+        self.startpre = False
+        self.pre_indent = ''
+        self.code = False
+        self.quote = False
+        self.lists: list[_ListState] = []
+        self.last_was_list = False
+        self.list_code_indent = ''
+        self.astack: list[dict[str, Any] | None] = []
+        self.maybe_automatic_link: str | None = None
+        self.empty_link = False
+        self.stressed = False
+        self.preceding_stressed = False
+        self.preceding_data = ''
+        self.current_tag = ''
+        self.split_next_td = False
+        self.td_count = 0
+        self.table_start = False
+        self.skipped = 0
+        self.pending: list[str] = []
+        self.abbr_title: str | None = None
+        self.abbr_data: str | None = None
+        self.abbr_list: dict[str, str] = {}
+
+    def start(self, tag: str, attrs: dict[str, str]):
+        if self.pending:
+            self._flush_text()
+        if tag in _SKIPPED_TAGS:
+            self.skipped += 1
+        elif not self.skipped:
+            self.handle_tag(tag, attrs, start=True)
+
+    def end(self, tag: str):
+        if self.pending:
+            self._flush_text()
+        if tag in _SKIPPED_TAGS:
+            self.skipped -= 1
+        elif not self.skipped:
+            self.handle_tag(tag, {}, start=False)
+
+    def data(self, text: str):
+        if not self.skipped:
+            self.pending.append(text)
+
+    def close(self) -> str:
+        if self.pending:
+            self._flush_text()
+        if self.abbr_list:
+            # html2textは文書の末尾に略語の定義を出力する
+            self.out.append('\n')
+            self.out.extend(f'  *[{abbr}]: {definition}\n' for abbr, definition in self.abbr_list.items())
+        return ''.join(self.out)
+
+    def _flush_text(self):
+        # libxml2はテキストを複数回に分けて渡すことがあるため、タグの境界でまとめて処理する
+        text = ''.join(self.pending) if len(self.pending) > 1 else self.pending[0]
+        self.pending.clear()
+        if _REF_START in text:
+            self.handle_text(text)
+        else:
+            self.handle_data(text)
+
+    def _p(self):
+        self.p_p = 2
+
+    def _pbr(self):
+        if self.p_p == 0:
+            self.p_p = 1
+
+    def _soft_br(self):
+        self._pbr()
+        self.br_toggle = '  '
+
+    def o(self, data: str, puredata: bool = False, force: bool = False):
+        if self.abbr_data is not None:
+            self.abbr_data += data
+        if puredata and not self.pre:
+            if data.isspace():
+                self.space = True
+                return
+            data = _WHITESPACE.sub(' ', data)
+            if data and data[0] == ' ':
+                self.space = True
+                data = data[1:]
+        if not data and not force:
+            return
+
+        if self.startpre and not data.startswith('\n'):
+            data = '\n' + data
+
+        bq = '>' * self.blockquote
+        if not (force and data and data[0] == '>') and self.blockquote:
+            bq += ' '
+
+        if self.pre:
+            if self.lists:
+                bq += self.list_code_indent
+            bq += '    '
+            data = data.replace('\n', '\n' + bq)
+            self.pre_indent = bq
+
+        if self.startpre:
+            self.startpre = False
+            if self.lists:
+                data = data.lstrip('\n' + self.pre_indent)
+
+        if self.at_start:
+            self.space = False
+            self.p_p = 0
+            self.at_start = False
+
+        out = self.out
+        if self.p_p:
+            out.append((self.br_toggle + '\n' + bq) * self.p_p)
+            self.space = False
+            self.br_toggle = ''
+
+        if self.space:
+            if out and out[-1][-1] != '\n':
+                out.append(' ')
+            self.space = False
+
+        self.p_p = 0
+        out.append(data)
+
+    def handle_text(self, text: str):
+        # 文字参照の前後でテキスト片を分ける（html2textのhandle_charref/handle_entityrefに相当）
+        for i, part in enumerate(_MARKED_REF.split(text)):
+            if i % 2:
+                self.handle_data(''.join(_UNIFIABLE_CHARS.get(char, char) for char in part), entity_char=True)
+            elif part:
+                self.handle_data(part)
+
+    def handle_data(self, data: str, entity_char: bool = False):
+        if not data:
+            return
+        if self.stressed:
+            data = data.strip()
+            self.stressed = False
+            self.preceding_stressed = True
+        elif self.preceding_stressed:
+            if (
+                _NOT_STRESS_BOUNDARY.match(data[0])
+                and self.current_tag not in _HEADINGS
+                and self.current_tag not in ('a', 'code', 'pre')
+            ):
+                data = ' ' + data
+            self.preceding_stressed = False
+
+        if self.maybe_automatic_link is not None:
+            href = self.maybe_automatic_link
+            if href == data and _ABSOLUTE_URL.match(href):
+                self.o('<' + data + '>')
+                self.empty_link = False
+                return
+            self.o('[')
+            self.maybe_automatic_link = None
+            self.empty_link = False
+
+        if not self.code and not self.pre and not entity_char and _MAY_NEED_ESCAPE.match(data):
+            data = escape_md_section(data)
+        self.preceding_data = data
+        self.o(data, puredata=True)
+
+    def handle_tag(self, tag: str, attrs: Any, start: bool):
+        self.current_tag = tag
+
+        if start and self.maybe_automatic_link is not None and tag not in _BLOCK_LINK_TAGS and tag != 'img':
+            self.o('[')
+            self.maybe_automatic_link = None
+            self.empty_link = False
+
+        if tag == 'abbr':
+            if start:
+                self.abbr_title = _attr(attrs, 'title')
+                self.abbr_data = ''
+            else:
+                if self.abbr_title is not None:
+                    self.abbr_list[self.abbr_data] = self.abbr_title
+                    self.abbr_title = None
+                self.abbr_data = None
+
+        if tag not in _HANDLED_TAGS:
+            # span, figureなど出力に影響しないタグ
+            self.last_was_list = False
+            return
+        if tag in _HEADINGS:
+            self._p()
+            if start:
+                self.o('#' * _HEADINGS[tag] + ' ')
+            else:
+                return
+        elif tag in ('p', 'div'):
+            if not self.astack and not self.split_next_td:
+                self._p()
+        elif tag == 'br':
+            if start:
+                self.o('  \n> ' if self.blockquote else '  \n')
+        elif tag == 'hr':
+            if start:
+                self._p()
+                self.o('* * *')
+                self._p()
+        elif tag == 'blockquote':
+            if start:
+                self._p()
+                self.o('> ', force=True)
+                self.at_start = True
+                self.blockquote += 1
+            else:
+                self.blockquote -= 1
+                self._p()
+        elif tag in ('em', 'i', 'u'):
+            if (
+                start
+                and self.preceding_data
+                and self.preceding_data[-1] not in string.whitespace
+                and self.preceding_data[-1] not in string.punctuation
+            ):
+                self.preceding_data += ' '
+                self.o(' _')
+            else:
+                self.o('_')
+            if start:
+                self.stressed = True
+        elif tag in ('strong', 'b'):
+            if start and self.preceding_data and self.preceding_data[-1] == '*':
+                self.preceding_data += ' '
+                self.o(' **')
+            else:
+                self.o('**')
+            if start:
+                self.stressed = True
+        elif tag in ('del', 'strike', 's'):
+            if start and self.preceding_data and self.preceding_data[-1] == '~':
+                self.preceding_data += ' '
+                self.o(' ~~')
+            else:
+                self.o('~~')
+            if start:
+                self.stressed = True
+        elif tag in ('kbd', 'code', 'tt'):
+            if not self.pre:
+                self.o('`')
+                self.code = not self.code
+        elif tag == 'q':
+            self.o('"')
+            self.quote = not self.quote
+        elif tag == 'a':
+            self._handle_link(attrs, start)
+        elif tag == 'img':
+            if start:
+                self._handle_image(attrs)
+        elif tag == 'dl':
+            if start:
+                self._p()
+        elif tag == 'dt':
+            if not start:
+                self._pbr()
+        elif tag == 'dd':
+            if start:
+                self.o('    ')
+            else:
+                self._pbr()
+        elif tag == 'li':
+            self._handle_list_item(start)
+        elif tag in ('table', 'tr', 'td', 'th'):
+            self._handle_table(tag, start)
+        elif tag == 'pre':
+            if start:
+                self.startpre = True
+                self.pre = True
+                self.pre_indent = ''
+            else:
+                self.pre = False
+            self._p()
+
+        if tag in ('ol', 'ul'):
+            if not self.lists and not self.last_was_list:
+                self._p()
+            if start:
+                self.lists.append(_ListState(tag, _attr(attrs, 'start')))
+            elif self.lists:
+                self.lists.pop()
+                if not self.lists:
+                    self.o('\n')
+            self.last_was_list = True
+        else:
+            self.last_was_list = False
+
+    def _handle_link(self, attrs: Any, start: bool):
+        if start:
+            href = _attr(attrs, 'href')
+            if href is not None and not href.startswith('#'):
+                self.astack.append({'href': href, 'title': _attr(attrs, 'title')})
+                self.maybe_automatic_link = href
+                self.empty_link = True
+            else:
+                self.astack.append(None)
+            return
+
+        if not self.astack:
+            return
+        link = self.astack.pop()
+        if self.maybe_automatic_link and not self.empty_link:
+            self.maybe_automatic_link = None
+        elif link:
+            if self.empty_link:
+                self.o('[')
+                self.empty_link = False
+                self.maybe_automatic_link = None
+            self.p_p = 0
+            title = escape_md(link['title'] or '')
+            title = f' "{title}"' if title.strip() else ''
+            self.o('](' + escape_md(link['href']) + title + ')')
+
+    def _handle_image(self, attrs: Any):
+        src = _attr(attrs, 'src')
+        if src is None:
+            return
+        if self.maybe_automatic_link is not None:
+            self.o('[')
+            self.maybe_automatic_link = None
+            self.empty_link = False
+        self.o('![' + escape_md(_attr(attrs, 'alt') or '') + ']')
+        self.o('(' + escape_md(src) + ')')
+
+    def _handle_list_item(self, start: bool):
+        self.list_code_indent = ''
+        self._pbr()
+        if not start:
+            return
+        item = self.lists[-1] if self.lists else _ListState('ul', None)
+        # ulは2文字、olの中のリストは3文字ずつ字下げする（CommonMarkの規則）
+        parent = None
+        for state in self.lists:
+            self.list_code_indent += '   ' if parent == 'ol' else '  '
+            parent = state.name
+        self.o(self.list_code_indent)
+        if item.name == 'ul':
+            self.list_code_indent += '  '
+            self.o('* ')
+        else:
+            item.num += 1
+            self.list_code_indent += '   '
+            self.o(f'{item.num}. ')
+        self.at_start = True
+
+    def _handle_table(self, tag: str, start: bool):
+        if tag == 'table':
+            if start:
+                self.table_start = True
+            return
+        if tag in ('td', 'th') and start:
+            if self.split_next_td:
+                self.o('| ')
+            self.split_next_td = True
+            self.td_count += 1
+        elif tag == 'tr':
+            if start:
+                self.td_count = 0
+            else:
+                self.split_next_td = False
+                self._soft_br()
+                if self.table_start:
+                    self.o('|'.join(['---'] * self.td_count))
+                    self._soft_br()
+                    self.table_start = False
+
+
+HTML_CONVERTERS: dict[str, type[BaseHtmlConverter]] = {
+    Html2TextConverter.name: Html2TextConverter,
+    LxmlHtmlConverter.name: LxmlHtmlConverter,
+}
+
+
+def get_html_converter(engine: HtmlEngine = 'auto') -> BaseHtmlConverter:
+    """
+    HTML→テキスト変換エンジンを取得する
+
+    Args:
+        engine (HtmlEngine, optional): 'lxml', 'html2text'、または利用可能な最速のエンジンを選ぶ'auto'. Defaults to 'auto'.
+
+    Returns:
+        BaseHtmlConverter: 変換エンジン
+    """
+    if engine != 'auto':
+        return HTML_CONVERTERS[engine]()
+    try:
+        return LxmlHtmlConverter()
+    except ImportError:
+        logger.info('lxml is not installed; falling back to the html2text engine.')
+        return Html2TextConverter()
+
+
+def benchmark_converter(converter: BaseHtmlConverter, documents: list[str], min_time: float = 1.0) -> float:
+    """
+    変換エンジンのスループットを計測する
+
+    Args:
+        converter (BaseHtmlConverter): 計測する変換エンジン
+        documents (list[str]): 変換するHTMLのリスト
+        min_time (float, optional): 計測を続ける最短時間（秒）. Defaults to 1.0.
+
+    Returns:
+        float: 1秒あたりの変換件数
+    """
+    count = 0
+    started = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_time:
+        for document in documents:
+            converter.convert(document)
+        count += len(documents)
+        elapsed = time.perf_counter() - started
+    return count / elapsed
+
+
+@click.command()
+@click.argument('files', nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option(
+    '--engine',
+    'engines',
+    multiple=True,
+    type=click.Choice(list(HTML_CONVERTERS)),
+    help='計測するエンジン（複数指定可、デフォルト: 全て）',
+)
+@click.option('--min-time', default=1.0, help='エンジンごとの最短計測時間（秒、デフォルト: 1.0）')
+def start_html_benchmark(files: tuple[Path, ...], engines: tuple[str, ...], min_time: float):
+    """
+    HTMLファイルを変換エンジンごとに繰り返し変換し、スループットを比較します。
+
+    Args:
+        files (tuple[Path, ...]): 変換するHTMLファイル（例: 投稿本文を保存したもの）
+        engines (tuple[str, ...]): 計測するエンジン
+        min_time (float): エンジンごとの最短計測時間
+    """
+    documents = [file.read_text(encoding='utf-8') for file in files]
+    total_kib = sum(len(document.encode('utf-8')) for document in documents) / 1024
+    click.echo(f'{len(documents)} documents, {total_kib:.1f} KiB')
+
+    baseline: float | None = None
+    for name in engines or HTML_CONVERTERS:
+        try:
+            converter = HTML_CONVERTERS[name]()
+        except ImportError as e:
+            click.echo(f'{name:>10}: skipped ({e})')
+            continue
+        rate = benchmark_converter(converter, documents, min_time=min_time)
+        baseline = baseline or rate
+        click.echo(f'{name:>10}: {rate:10.1f} docs/s  {rate * total_kib / len(documents) / 1024:8.2f} MiB/s  x{rate / baseline:.2f}')
@@ -1,13 +1,28 @@
 import asyncio
-from contextlib import asynccontextmanager
-from typing import Literal
+import hmac
+import tempfile
+from contextlib import AsyncExitStack, asynccontextmanager
+from functools import partial, wraps
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Literal
 
 import click
+import uvicorn
 from fastmcp import FastMCP
 from fastmcp.tools import Tool
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
 
 from src.config.env_config import EnvConfig, env_config
+from src.wordpress.cache import BaseCache, InMemoryCache, SQLiteCache
+from src.wordpress.deadline import deadline
+from src.wordpress.html_text import HtmlEngine, get_html_converter
+from src.wordpress.mcp.workers import RollingMultiprocess, notify_ready
+from src.wordpress.profiling import ProfileMode, ToolProfiler
+from src.wordpress.similarity import SignatureStore, SimilarityIndex
 from src.wordpress.tools.tool_manager import WordPressToolManager
+from src.wordpress.warmup import TermCacheWarmer
 from src.wordpress.wp_client import WordPressBasicClient, get_wordpress_client
 
 Transport = Literal['stdio', 'http', 'sse']
@@ -22,6 +37,19 @@ class WordPressMCPServer:
         host: str = 'localhost',
         port: int = 8080,
         transport: Transport = 'http',
+        workers: int = 1,
+        cache_path: str | None = None,
+        warm_cache: bool = False,
+        cache_refresh_interval: float = 300.0,
+        tool_timeout: float | None = None,
+        hedge_percentile: float | None = None,
+        similarity_path: str | None = None,
+        html_engine: HtmlEngine = 'auto',
+        profile_dir: str | None = None,
+        profile_sample_rate: float = 0.0,
+        profile_mode: ProfileMode = 'sample',
+        media_root: str | None = None,
+        profile_token: str | None = None,
     ):
         """
         WordPress用のMCPサーバー
@@ -33,6 +61,23 @@ class WordPressMCPServer:
             host (str, optional): サーバーホスト. Defaults to 'localhost'.
             port (int, optional): サーバーポート. Defaults to 8080.
             transport (Transport, optional): 通信プロトコル. Defaults to 'http'.
+            workers (int, optional): ワーカープロセス数（httpのみ、2以上の場合はステートレスHTTPで動作）. Defaults to 1.
+            cache_path (str, optional): ワーカー間で共有するSQLiteキャッシュのパス.
+                Defaults to None（workersが2以上の場合は起動ごとに作成する非公開の一時ディレクトリ、それ以外はプロセス内キャッシュ）.
+            warm_cache (bool, optional): 起動時に作成者・カテゴリ・タグを事前読み込みするかどうか. Defaults to False.
+            cache_refresh_interval (float, optional): 事前読み込みしたキャッシュの更新間隔（秒）. Defaults to 300.0.
+            tool_timeout (float, optional): ツール呼び出し1回あたりの期限（秒）. Defaults to None（期限なし）.
+            hedge_percentile (float, optional): GETリクエストをヘッジするレイテンシのパーセンタイル（0〜1）. Defaults to None（無効）.
+            similarity_path (str, optional): 類似投稿検索のシグネチャを保存するSQLiteファイルのパス.
+                Defaults to None（workersが2以上の場合は起動ごとに作成する非公開の一時ディレクトリ、それ以外はメモリ上に保持）.
+            html_engine (HtmlEngine, optional): 投稿のHTMLをテキストに変換するエンジン. Defaults to 'auto'（lxmlがあればlxml）.
+            profile_dir (str, optional): ツール呼び出しのプロファイルとイベントループのブロッキングを記録するディレクトリ.
+                Defaults to None（プロファイル無効）.
+            profile_sample_rate (float, optional): プロファイルするツール呼び出しの割合（0〜1）. Defaults to 0.0（/profileで予約した呼び出しのみ）.
+            profile_mode (ProfileMode, optional): 'sample'（統計的プロファイラ）または'cprofile'. Defaults to 'sample'.
+            media_root (str, optional): upload_media_toolでアップロードを許可するディレクトリ. Defaults to None（アップロード無効）.
+            profile_token (str, optional): POST /profile の認証に使うトークン（Authorization: Bearer）.
+                Defaults to None（/profileを公開しない）.
         """
         self.base_url = base_url
         self.username = username
@@ -40,41 +85,258 @@ class WordPressMCPServer:
         self.host = host
         self.port = port
         self.transport = transport
+        self.workers = workers
+        self.cache_path = cache_path
+        self.cache: BaseCache = SQLiteCache(cache_path) if cache_path else InMemoryCache()
+        self.warm_cache = warm_cache
+        self.cache_refresh_interval = cache_refresh_interval
+        self.tool_timeout = tool_timeout
+        self.hedge_percentile = hedge_percentile
+        self.similarity_path = similarity_path
+        self.html_engine = html_engine
+        self.html_converter = get_html_converter(html_engine)
+        self.similarity_index = SimilarityIndex(
+            store=SignatureStore(similarity_path) if similarity_path else None, html_converter=self.html_converter
+        )
+        self.profile_dir = profile_dir
+        self.profile_sample_rate = profile_sample_rate
+        self.profile_mode = profile_mode
+        self.profiler = ToolProfiler(profile_dir, sample_rate=profile_sample_rate, mode=profile_mode) if profile_dir else None
+        self.media_root = media_root
+        self.profile_token = profile_token
         self.tool_manager: WordPressToolManager | None = None
+        self._warmer: TermCacheWarmer | None = None
+        self._serving = False
         self._mcp = FastMCP(
             name='WordPressMCP',
             version='0.1.0',
             lifespan=self._config_lifecycle,
         )
+        self._mcp.custom_route('/ready', methods=['GET'])(self._readiness)
+        if self.profiler is not None and profile_token:
+            self._mcp.custom_route('/profile', methods=['POST'])(self._arm_profiler)
+
+    @property
+    def ready(self) -> bool:
+        """
+        リクエストを受け付ける準備ができているか（キャッシュの事前読み込みが有効な場合は初回の読み込み完了後にTrue）
+        """
+        return not self.warm_cache or (self._warmer is not None and self._warmer.ready)
 
     @property
     def mcp(self) -> FastMCP:
         return self._mcp
 
+    def http_app(self) -> Starlette:
+        """
+        http/sseトランスポート用のASGIアプリケーションを生成します。
+        FastMCPのHTTPセッションは各プロセスのメモリ上に保持されるため、ワーカーが複数の場合はステートレスHTTPにして
+        どのワーカーに届いたリクエストも処理できるようにします。
+
+        Returns:
+            Starlette: MCPサーバーのASGIアプリケーション
+        """
+        app = self._mcp.http_app(transport=self.transport, stateless_http=True if self.workers > 1 else None)
+        mcp_lifespan = app.router.lifespan_context
+
+        @asynccontextmanager
+        async def lifespan(app: Starlette):
+            async with self._serve_lifecycle(), mcp_lifespan(app):
+                yield
+
+        app.router.lifespan_context = lifespan
+        return app
+
+    def run_workers(self):
+        """
+        1つの待ち受けソケットを共有する複数のワーカープロセスでMCPサーバーを起動します。
+        各ワーカーはステートレスHTTPで動作してSQLiteキャッシュと類似投稿のシグネチャを共有し、SIGHUPでローリングリスタートします。
+        ローリングリスタートでは、新しいワーカーの準備が完了（/readyが200を返す状態）してから古いワーカーを停止します。
+        SSEはイベントストリームと/messagesへのPOSTが別のワーカーに届くと動作しないため、対応していません。
+        """
+        if self.transport not in ('http', 'streamable-http'):
+            raise ValueError('Multiple workers are only supported for the http transport.')
+
+        # 他のローカルユーザーがキャッシュを差し替えられないよう、所有者のみアクセスできる一時ディレクトリに作成する
+        with tempfile.TemporaryDirectory(prefix='wp-mcp-') as cache_dir:
+            self._run_workers(
+                cache_path=self.cache_path or str(Path(cache_dir) / 'cache.sqlite3'),
+                similarity_path=self.similarity_path or str(Path(cache_dir) / 'signatures.sqlite3'),
+            )
+
+    def _run_workers(self, cache_path: str, similarity_path: str):
+        app_factory = partial(
+            create_http_app,
+            base_url=self.base_url,
+            username=self.username,
+            app_password=self.app_password,
+            transport=self.transport,
+            workers=self.workers,
+            cache_path=cache_path,
+            warm_cache=self.warm_cache,
+            cache_refresh_interval=self.cache_refresh_interval,
+            tool_timeout=self.tool_timeout,
+            hedge_percentile=self.hedge_percentile,
+            similarity_path=similarity_path,
+            html_engine=self.html_engine,
+            profile_dir=self.profile_dir,
+            profile_sample_rate=self.profile_sample_rate,
+            profile_mode=self.profile_mode,
+            media_root=self.media_root,
+            profile_token=self.profile_token,
+        )
+        config = uvicorn.Config(
+            app_factory,
+            factory=True,
+            host=self.host,
+            port=self.port,
+            workers=self.workers,
+            timeout_graceful_shutdown=30,
+        )
+        sock = config.bind_socket()
+        RollingMultiprocess(config, target=uvicorn.Server(config=config).run, sockets=[sock]).run()
+
     async def run_mcp(self):
         """
         MCPサーバーを起動します。
         """
-        if self.transport == 'stdio':
-            await self._mcp.run_async(transport='stdio')
-        else:
-            await self._mcp.run_async(
-                transport=self.transport,
-                host=self.host,
-                port=self.port,
-            )
+        async with self._serve_lifecycle():
+            if self.transport == 'stdio':
+                await self._mcp.run_async(transport='stdio')
+            else:
+                await self._mcp.run_async(
+                    transport=self.transport,
+                    host=self.host,
+                    port=self.port,
+                )
+
+    async def _readiness(self, request: Request) -> JSONResponse:
+        return JSONResponse({'ready': self.ready}, status_code=200 if self.ready else 503)
+
+    async def _arm_profiler(self, request: Request) -> JSONResponse:
+        """
+        次のツール呼び出しをプロファイルするよう予約します（例: POST /profile?tool=fetch_posts_tool&count=3）。
+        Authorization: Bearer <profile_token> が必要です。複数ワーカーの場合は、リクエストを受けたワーカーでのみ有効です。
+        """
+        authorization = request.headers.get('authorization', '')
+        if not hmac.compare_digest(authorization.encode(), f'Bearer {self.profile_token}'.encode()):
+            return JSONResponse({'error': 'unauthorized'}, status_code=401)
+        try:
+            armed = self.profiler.arm(tool=request.query_params.get('tool'), count=int(request.query_params.get('count', '1')))
+        except ValueError:
+            return JSONResponse({'error': f'count must be an integer between 1 and {self.profiler.max_armed}'}, status_code=400)
+        return JSONResponse({'armed': armed, 'output_dir': str(self.profiler.output_dir)})
+
+    @asynccontextmanager
+    async def _serve_lifecycle(self):
+        """
+        サーバープロセス全体のライフサイクル
+        キャッシュの事前読み込みが有効な場合は、リクエストの受け付けと並行してバックグラウンドで読み込みと更新を行い、
+        初回の読み込みが完了するまで/readyは503を返します（WordPressに接続できなくても起動は失敗せず、再試行を続けます）。
+        プロファイルが有効な場合は、停止するまでイベントループのブロッキングを監視します。
+        """
+        async with AsyncExitStack() as stack:
+            # ステートレスHTTPではリクエストごとにセッションが作られるため、クライアントとツールはプロセスで1つ共有する
+            await stack.enter_async_context(self._tool_lifecycle())
+            self._serving = True
+            stack.callback(setattr, self, '_serving', False)
+
+            if self.profiler is not None:
+                self.profiler.start()
+                stack.push_async_callback(self.profiler.stop)
+
+            if self.warm_cache:
+                self._warmer = TermCacheWarmer(
+                    client=self.tool_manager.client,
+                    cache=self.cache,
+                    refresh_interval=self.cache_refresh_interval,
+                    max_age=self.tool_manager.term_cache_ttl,
+                )
+                await self._warmer.start()
+                stack.push_async_callback(self._warmer.stop)
+
+            notifier = asyncio.create_task(self._notify_when_ready())
+            stack.callback(notifier.cancel)
+            yield
+
+    async def _notify_when_ready(self):
+        """
+        準備が完了したら、ワーカープロセスのスーパーバイザーに通知します（ローリングリスタートで古いワーカーを停止する合図）。
+        """
+        if self._warmer is not None:
+            await self._warmer.wait_ready()
+        notify_ready()
+
+    def _wrap_tool(self, name: str, fn: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        """
+        ツール関数に呼び出し1回あたりの期限とプロファイルを設定します。
+        期限は配下の全てのWordPressリクエストのタイムアウトに引き継がれ、期限を過ぎると実行中のリクエストはキャンセルされます。
+        どちらも無効な場合は元の関数をそのまま返すため、オーバーヘッドはありません。
+
+        Args:
+            name (str): ツール名
+            fn (Callable): ツールのコルーチン関数
+
+        Returns:
+            Callable: 期限付き・プロファイル可能なツール関数
+        """
+        if self.tool_timeout is not None:
+            timed_fn = fn
+
+            @wraps(timed_fn)
+            async def wrapper(*args, **kwargs):
+                with deadline(self.tool_timeout):
+                    async with asyncio.timeout(self.tool_timeout):
+                        return await timed_fn(*args, **kwargs)
+
+            fn = wrapper
+
+        if self.profiler is not None:
+            fn = self.profiler.wrap(name, fn)
+        return fn
 
     @asynccontextmanager
     async def _config_lifecycle(self, server: FastMCP):
+        """
+        MCPセッションごとのライフサイクル
+        サーバープロセスのライフサイクル内ではそこで登録したツールを共有し、それ以外（インメモリ接続など）ではセッションごとに登録します。
+        """
+        if self._serving:
+            yield
+            return
+        async with self._tool_lifecycle():
+            yield
+
+    @asynccontextmanager
+    async def _tool_lifecycle(self):
+        """
+        WordPressクライアントを開き、ツールを登録します。
+        類似投稿検索のインデックスは、ツール呼び出しの期限に影響しないようバックグラウンドで構築・更新します。
+        """
         async with get_wordpress_client(
             base_url=self.base_url,
             username=self.username,
             app_password=self.app_password,
+            hedge_percentile=self.hedge_percentile,
         ) as wp_client:
-            self.tool_manager = WordPressToolManager(client=wp_client)
+            self.tool_manager = WordPressToolManager(
+                client=wp_client,
+                cache=self.cache,
+                similarity_index=self.similarity_index,
+                html_converter=self.html_converter,
+                media_root=self.media_root,
+            )
             for name, tool in self.tool_manager.dict_tools.items():
-                server.add_tool(Tool.from_function(fn=tool.coroutine, name=name, title=tool.name, description=tool.description))
-            yield
+                self._mcp.add_tool(
+                    Tool.from_function(
+                        fn=self._wrap_tool(name, tool.coroutine), name=name, title=tool.name, description=tool.description
+                    )
+                )
+            await self.similarity_index.start(wp_client)
+            try:
+                yield
+            finally:
+                await self.similarity_index.stop()
 
 
 def create_server() -> FastMCP:
@@ -86,6 +348,72 @@ def create_server() -> FastMCP:
     return server.mcp
 
 
+def create_http_app(
+    base_url: str,
+    username: str,
+    app_password: str,
+    transport: Transport = 'http',
+    workers: int = 1,
+    cache_path: str | None = None,
+    warm_cache: bool = False,
+    cache_refresh_interval: float = 300.0,
+    tool_timeout: float | None = None,
+    hedge_percentile: float | None = None,
+    similarity_path: str | None = None,
+    html_engine: HtmlEngine = 'auto',
+    profile_dir: str | None = None,
+    profile_sample_rate: float = 0.0,
+    profile_mode: ProfileMode = 'sample',
+    media_root: str | None = None,
+    profile_token: str | None = None,
+) -> Starlette:
+    """
+    ワーカープロセスごとにMCPサーバーのASGIアプリケーションを生成するファクトリ
+
+    Args:
+        base_url (str): WordPressサイトのベースURL
+        username (str): WordPressのユーザー名
+        app_password (str): WordPressのアプリパスワード
+        transport (Transport, optional): 通信プロトコル. Defaults to 'http'.
+        workers (int, optional): ワーカープロセス数（2以上の場合はステートレスHTTP）. Defaults to 1.
+        cache_path (str, optional): ワーカー間で共有するSQLiteキャッシュのパス. Defaults to None.
+        warm_cache (bool, optional): 起動時に作成者・カテゴリ・タグを事前読み込みするかどうか. Defaults to False.
+        cache_refresh_interval (float, optional): 事前読み込みしたキャッシュの更新間隔（秒）. Defaults to 300.0.
+        tool_timeout (float, optional): ツール呼び出し1回あたりの期限（秒）. Defaults to None.
+        hedge_percentile (float, optional): GETリクエストをヘッジするレイテンシのパーセンタイル. Defaults to None.
+        similarity_path (str, optional): 類似投稿検索のシグネチャを保存するSQLiteファイルのパス. Defaults to None.
+        html_engine (HtmlEngine, optional): 投稿のHTMLをテキストに変換するエンジン. Defaults to 'auto'.
+        profile_dir (str, optional): ツール呼び出しのプロファイルを記録するディレクトリ. Defaults to None.
+        profile_sample_rate (float, optional): プロファイルするツール呼び出しの割合. Defaults to 0.0.
+        profile_mode (ProfileMode, optional): 'sample'または'cprofile'. Defaults to 'sample'.
+        media_root (str, optional): upload_media_toolでアップロードを許可するディレクトリ. Defaults to None.
+        profile_token (str, optional): POST /profile の認証に使うトークン. Defaults to None.
+
+    Returns:
+        Starlette: MCPサーバーのASGIアプリケーション
+    """
+    server = WordPressMCPServer(
+        base_url=base_url,
+        username=username,
+        app_password=app_password,
+        transport=transport,
+        workers=workers,
+        cache_path=cache_path,
+        warm_cache=warm_cache,
+        cache_refresh_interval=cache_refresh_interval,
+        tool_timeout=tool_timeout,
+        hedge_percentile=hedge_percentile,
+        similarity_path=similarity_path,
+        html_engine=html_engine,
+        profile_dir=profile_dir,
+        profile_sample_rate=profile_sample_rate,
+        profile_mode=profile_mode,
+        media_root=media_root,
+        profile_token=profile_token,
+    )
+    return server.http_app()
+
+
 @click.command()
 @click.option('--host', default='localhost', help='サーバーホスト（デフォルト: localhost）')
 @click.option('--port', default=8080, help='サーバーポート（デフォルト: 8080）')
@@ -93,7 +421,60 @@ def create_server() -> FastMCP:
 @click.option('--username', default=env_config.WP_USERNAME, help='WordPressのユーザー名')
 @click.option('--app-password', default=env_config.WP_APP_PASSWORD, help='WordPressのアプリパスワード')
 @click.option('--transport', default='http', help='通信プロトコル（Literal["stdio", "http", "sse", "streamable-http"]）')
-def start_server(host: str, port: int, url: str, username: str, app_password: str, transport: Transport):
+@click.option('--workers', default=1, help='ワーカープロセス数（httpのみ、デフォルト: 1）')
+@click.option(
+    '--cache-path', default=None, help='ワーカー間で共有するSQLiteキャッシュのパス（デフォルト: 起動ごとの非公開一時ディレクトリ）'
+)
+@click.option('--warm-cache/--no-warm-cache', default=False, help='起動時に作成者・カテゴリ・タグを事前読み込みするかどうか')
+@click.option('--cache-refresh-interval', default=300.0, help='事前読み込みしたキャッシュの更新間隔（秒、デフォルト: 300）')
+@click.option('--tool-timeout', default=None, type=float, help='ツール呼び出し1回あたりの期限（秒、デフォルト: 期限なし）')
+@click.option('--hedge-percentile', default=None, type=float, help='GETリクエストをヘッジするレイテンシのパーセンタイル（例: 0.95）')
+@click.option('--similarity-path', default=None, help='類似投稿検索のシグネチャを保存するSQLiteファイルのパス')
+@click.option(
+    '--html-engine',
+    default='auto',
+    type=click.Choice(['auto', 'lxml', 'html2text']),
+    help='HTML→テキスト変換エンジン（デフォルト: auto）',
+)
+@click.option('--profile-dir', default=None, help='ツール呼び出しのプロファイルとイベントループのブロッキングを記録するディレクトリ')
+@click.option(
+    '--profile-sample-rate',
+    default=0.0,
+    help='プロファイルするツール呼び出しの割合（0〜1、デフォルト: 0、POST /profileで予約した呼び出しのみ）',
+)
+@click.option(
+    '--profile-mode', default='sample', type=click.Choice(['sample', 'cprofile']), help='プロファイラの種類（デフォルト: sample）'
+)
+@click.option(
+    '--media-root', default=None, help='upload_media_toolでアップロードを許可するディレクトリ（未指定の場合はアップロード無効）'
+)
+@click.option(
+    '--profile-token',
+    default=None,
+    envvar='WP_MCP_PROFILE_TOKEN',
+    help='POST /profile の認証トークン（未指定の場合は/profileを公開しない、環境変数 WP_MCP_PROFILE_TOKEN でも指定可）',
+)
+def start_server(
+    host: str,
+    port: int,
+    url: str,
+    username: str,
+    app_password: str,
+    transport: Transport,
+    workers: int,
+    cache_path: str | None,
+    warm_cache: bool,
+    cache_refresh_interval: float,
+    tool_timeout: float | None,
+    hedge_percentile: float | None,
+    similarity_path: str | None,
+    html_engine: HtmlEngine,
+    profile_dir: str | None,
+    profile_sample_rate: float,
+    profile_mode: ProfileMode,
+    media_root: str | None,
+    profile_token: str | None,
+):
     """
     WordPress用のMCPサーバーを起動します。
 
@@ -104,6 +485,19 @@ def start_server(host: str, port: int, url: str, username: str, app_password: st
         username (str): WordPressのユーザー名
         app_password (str): WordPressのアプリパスワード
         transport (Transport): 通信プロトコル
+        workers (int): ワーカープロセス数
+        cache_path (str | None): ワーカー間で共有するSQLiteキャッシュのパス
+        warm_cache (bool): 起動時に作成者・カテゴリ・タグを事前読み込みするかどうか
+        cache_refresh_interval (float): 事前読み込みしたキャッシュの更新間隔（秒）
+        tool_timeout (float | None): ツール呼び出し1回あたりの期限（秒）
+        hedge_percentile (float | None): GETリクエストをヘッジするレイテンシのパーセンタイル
+        similarity_path (str | None): 類似投稿検索のシグネチャを保存するSQLiteファイルのパス
+        html_engine (HtmlEngine): HTML→テキスト変換エンジン
+        profile_dir (str | None): ツール呼び出しのプロファイルを記録するディレクトリ
+        profile_sample_rate (float): プロファイルするツール呼び出しの割合
+        profile_mode (ProfileMode): プロファイラの種類
+        media_root (str | None): upload_media_toolでアップロードを許可するディレクトリ
+        profile_token (str | None): POST /profile の認証トークン
     """
     server = WordPressMCPServer(
         base_url=url,
@@ -112,5 +506,21 @@ def start_server(host: str, port: int, url: str, username: str, app_password: st
         host=host,
         port=port,
         transport=transport,
+        workers=workers,
+        cache_path=cache_path,
+        warm_cache=warm_cache,
+        cache_refresh_interval=cache_refresh_interval,
+        tool_timeout=tool_timeout,
+        hedge_percentile=hedge_percentile,
+        similarity_path=similarity_path,
+        html_engine=html_engine,
+        profile_dir=profile_dir,
+        profile_sample_rate=profile_sample_rate,
+        profile_mode=profile_mode,
+        media_root=media_root,
+        profile_token=profile_token,
     )
-    asyncio.run(server.run_mcp())
+    if workers > 1:
+        server.run_workers()
+    else:
+        asyncio.run(server.run_mcp())
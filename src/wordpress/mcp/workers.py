@@ -0,0 +1,96 @@
+import multiprocessing
+import os
+import time
+from socket import socket
+from typing import Any, Callable
+
+from uvicorn.config import Config
+from uvicorn.supervisors.multiprocess import Multiprocess, Process
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_ready_event: Any = None
+
+
+def notify_ready() -> None:
+    """
+    ワーカープロセスがリクエストを受け付ける準備を終えたことをスーパーバイザーに通知する
+    ローリングリスタートで起動されたワーカー以外では何もしない。
+    """
+    if _ready_event is not None:
+        _ready_event.set()
+
+
+class WorkerProcess(Process):
+    """
+    準備完了の通知を受け取れるワーカープロセス
+    """
+
+    def __init__(self, config: Config, target: Callable[[list[socket] | None], None], sockets: list[socket]):
+        # uvicornはspawnでワーカーを起動するため、同じコンテキストのEventを子プロセスに渡す
+        self.ready_event = multiprocessing.get_context('spawn').Event()
+        super().__init__(config, target, sockets)
+
+    def target(self, sockets: list[socket] | None = None) -> Any:
+        global _ready_event
+        _ready_event = self.ready_event
+        return super().target(sockets)
+
+    def wait_ready(self, timeout: float) -> bool:
+        """
+        準備完了の通知を待ちます。
+
+        Args:
+            timeout (float): 待ち時間の上限（秒）
+
+        Returns:
+            bool: 通知を受け取った場合はTrue、プロセスが終了した場合やタイムアウトした場合はFalse
+        """
+        deadline = time.monotonic() + timeout
+        while not self.ready_event.wait(min(0.1, max(deadline - time.monotonic(), 0))):
+            if not self.process.is_alive() or time.monotonic() >= deadline:
+                return False
+        return True
+
+
+class RollingMultiprocess(Multiprocess):
+    """
+    1つの待ち受けソケットを共有するワーカープロセス群のスーパーバイザー
+    uvicornのMultiprocessを拡張し、SIGHUP受信時に新しいワーカーの準備完了（ライフサイクルの起動と
+    キャッシュの事前読み込み）を確認してから古いワーカーを1つずつ停止するローリングリスタートを行う
+    （処理中のリクエストは古いワーカーが処理し終える）。
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        target: Callable[[list[socket] | None], None],
+        sockets: list[socket],
+        ready_timeout: float = 120.0,
+    ):
+        """
+        Args:
+            config (Config): uvicornの設定
+            target (Callable): ワーカープロセスで実行する関数
+            sockets (list[socket]): 共有する待ち受けソケット
+            ready_timeout (float, optional): 新しいワーカーの準備完了を待つ時間の上限（秒）. Defaults to 120.0.
+        """
+        super().__init__(config, target, sockets)
+        self.ready_timeout = ready_timeout
+
+    def restart_all(self) -> None:
+        for idx, old_process in enumerate(self.processes):
+            new_process = WorkerProcess(self.config, self.target, self.sockets)
+            new_process.start()
+            if not new_process.wait_ready(timeout=self.ready_timeout):
+                logger.error(f'Worker process [{new_process.pid}] did not become ready, keeping [{old_process.pid}].')
+                new_process.kill()
+                new_process.join()
+                continue
+
+            self.processes[idx] = new_process
+            old_process.terminate()
+            old_process.join()
+            logger.info(f'Replaced worker process [{old_process.pid}] with [{new_process.pid}] (parent [{os.getpid()}]).')
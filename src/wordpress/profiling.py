@@ -0,0 +1,311 @@
+import asyncio
+import cProfile
+import itertools
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from functools import wraps
+from pathlib import Path
+from types import FrameType
+from typing import Any, Awaitable, Callable, Literal
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+ProfileMode = Literal['sample', 'cprofile']
+
+
+def folded_stack(frame: FrameType | None) -> str:
+    """
+    フレームから呼び出し元までをflamegraph.pl / speedscope形式（folded stacks）の1行分に変換する
+
+    Args:
+        frame (FrameType | None): 末端のフレーム
+
+    Returns:
+        str: ルートから末端までの 'module:関数名' をセミコロンで連結した文字列
+    """
+    names = []
+    while frame is not None:
+        names.append(f'{frame.f_globals.get("__name__", "?")}:{frame.f_code.co_qualname}')
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class LoopBlockMonitor:
+    def __init__(self, threshold: float = 0.1, on_block: Callable[[float, str | None], None] | None = None):
+        """
+        イベントループのブロッキング（1つのコールバックがループを長時間占有すること）を検出するウォッチドッグ
+
+        ループ上のハートビートをthreshold / 2間隔でスケジュールし、別スレッドから遅れを監視する。
+        遅れがthresholdを超えた時点でループスレッドのスタックを取得するため、ブロックしている処理そのものが分かる。
+        asyncioのデバッグモード（slow_callback_duration）と違い、本番で常時有効にできる程度の負荷で動作する。
+
+        Args:
+            threshold (float, optional): ブロッキングとみなすハートビートの遅れ（秒）. Defaults to 0.1.
+            on_block (Callable, optional): ブロッキングを検出したときに（遅れ秒数, スタック）で呼ばれるコールバック. Defaults to None.
+        """
+        self.threshold = threshold
+        self.interval = threshold / 2
+        self.blocked_time = 0.0
+        self.block_count = 0
+        self._on_block = on_block
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread_id: int | None = None
+        self._handle: asyncio.TimerHandle | None = None
+        self._last_beat = 0.0
+        self._stack: str | None = None
+        self._stop = threading.Event()
+        self._watchdog: threading.Thread | None = None
+
+    def start(self):
+        """
+        実行中のイベントループの監視を開始します。
+        """
+        self._loop = asyncio.get_running_loop()
+        self._thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._handle = self._loop.call_later(self.interval, self._beat)
+        self._stop.clear()
+        self._watchdog = threading.Thread(target=self._watch, name='loop-block-monitor', daemon=True)
+        self._watchdog.start()
+
+    def stop(self):
+        """
+        監視を停止します。
+        """
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        self._stop.set()
+        if self._watchdog is not None:
+            self._watchdog.join()
+            self._watchdog = None
+
+    def _beat(self):
+        now = time.monotonic()
+        lag = now - self._last_beat - self.interval
+        if lag >= self.threshold:
+            self.blocked_time += lag
+            self.block_count += 1
+            if self._on_block is not None:
+                self._on_block(lag, self._stack)
+        self._stack = None
+        self._last_beat = now
+        self._handle = self._loop.call_later(self.interval, self._beat)
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            if self._stack is None and time.monotonic() - self._last_beat - self.interval >= self.threshold:
+                frame = sys._current_frames().get(self._thread_id)
+                if frame is not None:
+                    self._stack = folded_stack(frame)
+
+
+class _StackSampler:
+    def __init__(self, thread_id: int, interval: float):
+        """
+        指定スレッドのスタックを一定間隔で採取する統計的プロファイラ
+        """
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='tool-profiler-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.counts[folded_stack(frame)] += 1
+
+
+class ToolProfiler:
+    def __init__(
+        self,
+        output_dir: str | Path,
+        sample_rate: float = 0.0,
+        mode: ProfileMode = 'sample',
+        sampling_interval: float = 0.005,
+        block_threshold: float = 0.1,
+        max_armed: int = 10,
+        max_block_log_bytes: int = 10 * 1024 * 1024,
+    ):
+        """
+        MCPツール呼び出し単位のオンデマンドプロファイラ
+
+        sample_rateの確率で抽出した呼び出し、またはarmで指定した呼び出しだけをプロファイルし、
+        それ以外の呼び出しには乱数1回分の負荷しかかけないため、本番で有効にしたままにできる。
+        プロファイル中はループスレッド全体を計測するため、同時に実行中の他のツール呼び出しも結果に含まれる。
+        同時にプロファイルするのは1呼び出しまでとし、実行中に来た呼び出しはプロファイルせずに実行する。
+
+        出力（output_dir配下、呼び出しごと）:
+            - <id>.folded: 'sample'モードのスタック採取結果（flamegraph.pl / speedscopeで読めるfolded stacks形式）
+            - <id>.prof: 'cprofile'モードの結果（pstats形式、snakevizなどで閲覧）
+            - <id>.json: ツール名・所要時間・イベントループのブロッキング時間などの概要
+            - loop-blocks.folded: ブロッキングを検出したときのループスレッドのスタック（重みはミリ秒）。
+              max_block_log_bytesを超えるとloop-blocks.folded.1に移して新しいファイルに書き始める。
+
+        Args:
+            output_dir (str | Path): 出力先ディレクトリ
+            sample_rate (float, optional): プロファイルする呼び出しの割合（0〜1）. Defaults to 0.0（armしたときのみ）.
+            mode (ProfileMode, optional): 'sample'（統計的プロファイラ）または'cprofile'. Defaults to 'sample'.
+            sampling_interval (float, optional): 'sample'モードのスタック採取間隔（秒）. Defaults to 0.005.
+            block_threshold (float, optional): イベントループのブロッキングとみなす遅れ（秒）. Defaults to 0.1.
+            max_armed (int, optional): ツールごとに予約できるプロファイル回数の上限. Defaults to 10.
+            max_block_log_bytes (int, optional): loop-blocks.folded をローテーションするサイズ（バイト）. Defaults to 10 MiB.
+        """
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.sample_rate = sample_rate
+        self.mode = mode
+        self.sampling_interval = sampling_interval
+        self.max_armed = max_armed
+        self.max_block_log_bytes = max_block_log_bytes
+        self.monitor = LoopBlockMonitor(threshold=block_threshold, on_block=self._record_block)
+        self._armed: dict[str, int] = {}
+        self._block_log_lock = threading.Lock()
+        self._active = False
+        self._counter = itertools.count(1)
+        self._writes: set[asyncio.Future] = set()
+
+    def start(self):
+        """
+        イベントループのブロッキング監視を開始します。
+        """
+        self.monitor.start()
+
+    async def stop(self):
+        """
+        ブロッキング監視を停止し、書き出し中のプロファイルを待ちます。
+        """
+        self.monitor.stop()
+        if self._writes:
+            await asyncio.gather(*self._writes, return_exceptions=True)
+
+    def arm(self, tool: str | None = None, count: int = 1) -> dict[str, int]:
+        """
+        次のcount回の呼び出しを確実にプロファイルするよう予約します。
+        負荷が際限なく増えないよう、予約回数はツールごとにmax_armedまでに制限します。
+
+        Args:
+            tool (str, optional): 対象のツール名. Defaults to None（全てのツール）.
+            count (int, optional): プロファイルする呼び出し回数（1〜max_armed）. Defaults to 1.
+
+        Returns:
+            dict[str, int]: ツール名（全ツールは'*'）ごとの残り予約回数
+        """
+        if not 1 <= count <= self.max_armed:
+            raise ValueError(f'count must be between 1 and {self.max_armed}.')
+        key = tool or '*'
+        self._armed[key] = min(self._armed.get(key, 0) + count, self.max_armed)
+        return dict(self._armed)
+
+    def wrap(self, name: str, fn: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        """
+        ツール関数をプロファイル対象にします。
+
+        Args:
+            name (str): ツール名
+            fn (Callable): ツールのコルーチン関数
+
+        Returns:
+            Callable: プロファイル可能なツール関数
+        """
+
+        @wraps(fn)
+        async def wrapper(*args, **kwargs):
+            if self._active or not self._should_profile(name):
+                return await fn(*args, **kwargs)
+            return await self._profile_call(name, fn, args, kwargs)
+
+        return wrapper
+
+    def _should_profile(self, name: str) -> bool:
+        for key in (name, '*'):
+            if self._armed.get(key):
+                self._armed[key] -= 1
+                if not self._armed[key]:
+                    del self._armed[key]
+                return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate  # noqa: S311
+
+    async def _profile_call(self, name: str, fn: Callable[..., Awaitable[Any]], args: tuple, kwargs: dict) -> Any:
+        self._active = True
+        call_id = f'{datetime.now().strftime("%Y%m%dT%H%M%S")}-{os.getpid()}-{next(self._counter)}-{name}'
+        started_at = datetime.now(timezone.utc)
+        blocked_before = self.monitor.blocked_time
+        sampler = _StackSampler(threading.get_ident(), self.sampling_interval) if self.mode == 'sample' else None
+        profile = cProfile.Profile() if self.mode == 'cprofile' else None
+        error = None
+        started = time.perf_counter()
+        try:
+            if sampler is not None:
+                sampler.start()
+            if profile is not None:
+                profile.enable()
+            return await fn(*args, **kwargs)
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            if profile is not None:
+                profile.disable()
+            if sampler is not None:
+                sampler.stop()
+            wall_time = time.perf_counter() - started
+            self._active = False
+            summary = {
+                'id': call_id,
+                'tool': name,
+                'mode': self.mode,
+                'started_at': started_at.isoformat(),
+                'wall_time': wall_time,
+                'loop_blocked_time': self.monitor.blocked_time - blocked_before,
+                'samples': sampler.counts.total() if sampler is not None else None,
+                'error': error,
+            }
+            logger.info(f'Profiled {name} in {wall_time:.3f}s ({call_id})')
+            # 書き出しはツールの応答を遅らせないようスレッドで行う
+            write = asyncio.get_running_loop().run_in_executor(None, self._write_profile, call_id, summary, sampler, profile)
+            self._writes.add(write)
+            write.add_done_callback(self._writes.discard)
+
+    def _write_profile(self, call_id: str, summary: dict[str, Any], sampler: _StackSampler | None, profile: cProfile.Profile | None):
+        if sampler is not None:
+            path = self.output_dir / f'{call_id}.folded'
+            path.write_text(''.join(f'{stack} {count}\n' for stack, count in sampler.counts.most_common()), encoding='utf-8')
+        else:
+            path = self.output_dir / f'{call_id}.prof'
+            profile.dump_stats(path)
+        summary['profile'] = path.name
+        (self.output_dir / f'{call_id}.json').write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding='utf-8')
+
+    def _record_block(self, lag: float, stack: str | None):
+        logger.warning(f'Event loop was blocked for {lag * 1000:.0f} ms')
+        # ハートビートはループ上で呼ばれるため、ファイルへの書き込みはスレッドで行う
+        line = f'{stack or "unknown"} {max(1, round(lag * 1000))}\n'
+        write = asyncio.get_running_loop().run_in_executor(None, self._append_block, line)
+        self._writes.add(write)
+        write.add_done_callback(self._writes.discard)
+
+    def _append_block(self, line: str):
+        with self._block_log_lock:
+            path = self.output_dir / 'loop-blocks.folded'
+            if path.exists() and path.stat().st_size >= self.max_block_log_bytes:
+                path.replace(path.with_name(f'{path.name}.1'))
+            with path.open('a', encoding='utf-8') as f:
+                f.write(line)
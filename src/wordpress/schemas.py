@@ -46,6 +46,57 @@ class DeletePostResult(BaseModel):
     previous: Optional[WPPreviousPost] = Field(description='削除前の投稿データ')
 
 
+class MediaSchema(BaseModel):
+    id: int = Field(description='WordPressで割り当てられるメディアの一意なID')
+    title: str = Field(description='メディアのタイトル（HTMLタグを除去したテキスト）')
+    source_url: str = Field(description='アップロードされたファイルの公開URL')
+    mime_type: Optional[str] = Field(default=None, description='メディアのMIMEタイプ（例: image/png）')
+    reused: bool = Field(default=False, description='同じ内容のメディアがアップロード済みで、再送せずに再利用したかどうか')
+
+
+class UploadMediaResult(BaseModel):
+    media: List[MediaSchema] = Field(description='アップロードしたメディアのリスト（入力ファイルと同じ順序）')
+    count: int = Field(description='アップロードしたメディアの総数')
+    reused_count: int = Field(description='重複判定により再送しなかったメディアの数')
+
+
+class ExportPostsResult(BaseModel):
+    path: str = Field(description='出力先のパス')
+    format: Literal['jsonl', 'parquet'] = Field(description='出力形式')
+    count: int = Field(description='今回書き出した投稿の数')
+    last_id: int = Field(description='最後に書き出した投稿のID（再開時はこのIDの次から書き出す）')
+    elapsed_seconds: float = Field(description='エクスポートにかかった時間（秒）')
+
+
+class PostReference(BaseModel):
+    id: int = Field(description='投稿の一意なID')
+    title: str = Field(description='投稿のタイトル（HTMLタグを除去したテキスト）')
+    url: str = Field(description='投稿の公開URL')
+
+
+class SimilarPost(PostReference):
+    similarity: float = Field(description='本文の推定類似度（MinHashによるJaccard係数の推定値、0〜1）')
+
+
+class SimilarPostsResult(BaseModel):
+    post_id: int = Field(description='基準とした投稿のID')
+    similar_posts: List[SimilarPost] = Field(description='類似する投稿のリスト（類似度の高い順）')
+    count: int = Field(description='類似する投稿の数')
+
+
+class SimilarPostPair(BaseModel):
+    first: PostReference = Field(description='組の一方の投稿（IDの小さい方）')
+    second: PostReference = Field(description='組のもう一方の投稿')
+    similarity: float = Field(description='本文の推定類似度（MinHashによるJaccard係数の推定値、0〜1）')
+
+
+class SimilarityReport(BaseModel):
+    pairs: List[SimilarPostPair] = Field(description='類似する投稿の組のリスト（類似度の高い順）')
+    count: int = Field(description='類似する投稿の組の数')
+    indexed_posts: int = Field(description='インデックス済みの投稿数')
+    threshold: float = Field(description='組に含めた推定類似度の下限')
+
+
 class PostListQueryParams(BaseModel):
     """投稿一覧取得のためのクエリパラメーター"""
 
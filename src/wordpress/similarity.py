@@ -0,0 +1,687 @@
+import asyncio
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+import uuid
+from datetime import datetime, timedelta
+from itertools import combinations
+from pathlib import Path
+from typing import Any
+
+import click
+import numpy as np
+
+from src.config.env_config import env_config
+from src.utils.logger import get_logger
+from src.wordpress.deadline import gather_or_cancel
+from src.wordpress.html_text import BaseHtmlConverter, HtmlEngine, get_html_converter
+from src.wordpress.schemas import PostReference, SimilarityReport, SimilarPost, SimilarPostPair, SimilarPostsResult
+from src.wordpress.wp_client import WordPressBasicClient, get_wordpress_client
+
+logger = get_logger(__name__)
+
+_NORMALIZE_PATTERN = re.compile(r'[\W_]+')
+_EMPTY_MINHASH = np.iinfo(np.uint32).max
+
+
+def shingle_hashes(text: str, k: int = 3) -> np.ndarray:
+    """
+    テキストを文字k-gram（シングル）に分割し、それぞれの32bitハッシュを求める
+    日本語は単語の区切りに空白を使わないため、単語ではなく文字単位のシングルを使う。
+    NFKC正規化・小文字化した上で、空白や記号（Markdownの記法を含む）を除去してから分割する。
+
+    Args:
+        text (str): 対象テキスト
+        k (int, optional): シングルの文字数. Defaults to 3.
+
+    Returns:
+        np.ndarray: 重複を除いたシングルのハッシュ（uint64に格納した32bit値）
+    """
+    normalized = _NORMALIZE_PATTERN.sub('', unicodedata.normalize('NFKC', text).lower())
+    if not normalized:
+        return np.empty(0, dtype=np.uint64)
+
+    codepoints = np.frombuffer(normalized.encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+    k = min(k, len(codepoints))
+    windows = np.lib.stride_tricks.sliding_window_view(codepoints, k)
+    powers = np.uint64(0x100000001B3) ** np.arange(k - 1, -1, -1, dtype=np.uint64)
+    hashes = (windows * powers).sum(axis=1, dtype=np.uint64)
+    # murmur3のfmix64で各ビットを拡散させてから下位32bitを使う
+    hashes ^= hashes >> np.uint64(33)
+    hashes *= np.uint64(0xFF51AFD7ED558CCD)
+    hashes ^= hashes >> np.uint64(33)
+    hashes *= np.uint64(0xC4CEB9FE1A85EC53)
+    hashes ^= hashes >> np.uint64(33)
+    return np.unique(hashes & np.uint64(0xFFFFFFFF))
+
+
+class MinHasher:
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        """
+        シングルのハッシュ集合からMinHashシグネチャを求める
+        num_perm個のmultiply-shiftハッシュ ((a * x + b) mod 2^64) >> 32 をNumPyでまとめて計算する。
+        剰余演算を使わず、uint64の桁あふれをそのままmod 2^64として使うため高速に計算できる。
+
+        Args:
+            num_perm (int, optional): シグネチャの長さ（ハッシュ関数の数）. Defaults to 128.
+            seed (int, optional): ハッシュ関数の係数を決める乱数シード. Defaults to 1.
+        """
+        self.num_perm = num_perm
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(0, np.iinfo(np.uint64).max, size=(num_perm, 1), dtype=np.uint64, endpoint=True) | np.uint64(1)
+        self._b = rng.integers(0, np.iinfo(np.uint64).max, size=(num_perm, 1), dtype=np.uint64, endpoint=True)
+        self._chunk_size = 4096
+
+    def signature(self, hashes: np.ndarray) -> np.ndarray:
+        """
+        MinHashシグネチャを求めます。
+
+        Args:
+            hashes (np.ndarray): shingle_hashesで求めたシングルのハッシュ
+
+        Returns:
+            np.ndarray: 長さnum_permのシグネチャ（uint32）。シングルが無い場合は全ての値が0xFFFFFFFFになる。
+        """
+        signature = np.full(self.num_perm, _EMPTY_MINHASH, dtype=np.uint64)
+        # (num_perm × シングル数) の行列が大きくなりすぎないよう、シングルを分割して計算する
+        for start in range(0, len(hashes), self._chunk_size):
+            chunk = hashes[start : start + self._chunk_size]
+            np.minimum(signature, ((self._a * chunk + self._b) >> np.uint64(32)).min(axis=1), out=signature)
+        return signature.astype(np.uint32)
+
+
+def is_empty_signature(signature: np.ndarray) -> bool:
+    """
+    シングルが1つも無いテキスト（画像やショートコードのみの投稿など）のシグネチャかどうかを判定する
+
+    Args:
+        signature (np.ndarray): シグネチャ
+
+    Returns:
+        bool: 空集合のシグネチャの場合はTrue
+    """
+    return bool((signature == _EMPTY_MINHASH).all())
+
+
+def estimate_similarity(signature: np.ndarray, other: np.ndarray) -> float:
+    """
+    2つのMinHashシグネチャから、元のシングル集合のJaccard係数を推定する
+    空集合同士は全ての値が一致するが、本文が無い投稿を重複とみなさないよう類似度0とする。
+
+    Args:
+        signature (np.ndarray): シグネチャ
+        other (np.ndarray): 比較対象のシグネチャ
+
+    Returns:
+        float: 推定Jaccard係数（0〜1）
+    """
+    if is_empty_signature(signature) or is_empty_signature(other):
+        return 0.0
+    return float(np.count_nonzero(signature == other) / len(signature))
+
+
+class MinHashLSH:
+    def __init__(self, num_perm: int = 128, bands: int = 32):
+        """
+        MinHashシグネチャをバンドに分割してバケットに登録し、類似候補を全件比較せずに探すLSHインデックス
+        bands × rows = num_perm とすると、Jaccard係数がおよそ (1 / bands) ** (1 / rows) 以上の組が候補になる。
+        空集合のシグネチャは全てのバンドが一致してしまうため登録せず、候補にもならない。
+
+        Args:
+            num_perm (int, optional): シグネチャの長さ. Defaults to 128.
+            bands (int, optional): バンド数（num_permの約数）. Defaults to 32.
+        """
+        if num_perm % bands:
+            raise ValueError(f'num_perm ({num_perm}) must be divisible by bands ({bands}).')
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._buckets: dict[tuple[int, bytes], set[int]] = {}
+        self._keys: dict[int, list[tuple[int, bytes]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _band_keys(self, signature: np.ndarray) -> list[tuple[int, bytes]]:
+        return [(band, row.tobytes()) for band, row in enumerate(signature.reshape(self.bands, self.rows))]
+
+    def insert(self, key: int, signature: np.ndarray):
+        """
+        シグネチャを登録します（同じキーが登録済みの場合は置き換えます）。
+
+        Args:
+            key (int): 投稿ID
+            signature (np.ndarray): MinHashシグネチャ
+        """
+        self.remove(key)
+        if is_empty_signature(signature):
+            return
+        band_keys = self._band_keys(signature)
+        for band_key in band_keys:
+            self._buckets.setdefault(band_key, set()).add(key)
+        self._keys[key] = band_keys
+
+    def remove(self, key: int):
+        """
+        シグネチャの登録を解除します。
+
+        Args:
+            key (int): 投稿ID
+        """
+        for band_key in self._keys.pop(key, []):
+            bucket = self._buckets[band_key]
+            bucket.discard(key)
+            if not bucket:
+                del self._buckets[band_key]
+
+    def query(self, signature: np.ndarray) -> set[int]:
+        """
+        いずれかのバンドが一致する候補を取得します。
+
+        Args:
+            signature (np.ndarray): MinHashシグネチャ
+
+        Returns:
+            set[int]: 候補の投稿IDの集合
+        """
+        candidates: set[int] = set()
+        if is_empty_signature(signature):
+            return candidates
+        for band_key in self._band_keys(signature):
+            candidates.update(self._buckets.get(band_key, ()))
+        return candidates
+
+    def candidate_pairs(self) -> set[tuple[int, int]]:
+        """
+        同じバケットに入った全ての組（候補ペア）を取得します。
+
+        Returns:
+            set[tuple[int, int]]: (小さいID, 大きいID) の組の集合
+        """
+        pairs: set[tuple[int, int]] = set()
+        for bucket in self._buckets.values():
+            if len(bucket) > 1:
+                pairs.update(combinations(sorted(bucket), 2))
+        return pairs
+
+
+class SignatureStore:
+    def __init__(self, path: str | Path = ':memory:'):
+        """
+        投稿ごとのMinHashシグネチャと更新日時を保存するSQLiteストア
+        再起動後も計算済みのシグネチャを再利用し、更新された投稿だけを再計算するために使う。
+
+        Args:
+            path (str | Path, optional): SQLiteデータベースファイルのパス. Defaults to ':memory:'.
+        """
+        self.path = str(path)
+        self._lock = threading.Lock()
+        if self.path != ':memory:':
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS signatures ('
+            'id INTEGER PRIMARY KEY, modified TEXT NOT NULL, title TEXT NOT NULL, url TEXT NOT NULL, signature BLOB NOT NULL)'
+        )
+        self._conn.execute('CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+
+    def load(self, ids: list[int]) -> dict[int, tuple[str, str, str, np.ndarray]]:
+        loaded = {}
+        with self._lock:
+            for start in range(0, len(ids), 500):
+                chunk = ids[start : start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f'SELECT id, modified, title, url, signature FROM signatures WHERE id IN ({placeholders})',  # noqa: S608
+                    chunk,
+                )
+                loaded.update({row[0]: (row[1], row[2], row[3], np.frombuffer(row[4], dtype=np.uint32)) for row in rows})
+        return loaded
+
+    def list_modified(self) -> dict[int, str]:
+        with self._lock:
+            return dict(self._conn.execute('SELECT id, modified FROM signatures'))
+
+    def upsert(self, rows: list[tuple[int, str, str, str, np.ndarray]]):
+        with self._lock, self._conn:
+            self._conn.execute('BEGIN')
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO signatures (id, modified, title, url, signature) VALUES (?, ?, ?, ?, ?)',
+                [(post_id, modified, title, url, signature.tobytes()) for post_id, modified, title, url, signature in rows],
+            )
+
+    def clear(self):
+        """
+        全てのシグネチャと同期状態を削除します（他のプロセスが取得中のリースは残します）。
+        """
+        with self._lock, self._conn:
+            self._conn.execute('BEGIN')
+            self._conn.execute('DELETE FROM signatures')
+            self._conn.execute("DELETE FROM sync_state WHERE key != 'lease'")
+
+    def delete(self, ids: list[int]):
+        with self._lock, self._conn:
+            self._conn.execute('BEGIN')
+            self._conn.executemany('DELETE FROM signatures WHERE id = ?', [(post_id,) for post_id in ids])
+
+    def get_state(self) -> dict[str, Any]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM sync_state WHERE key = 'state'").fetchone()
+            return json.loads(row[0]) if row else {}
+
+    def set_state(self, state: dict[str, Any]):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO sync_state (key, value) VALUES ('state', ?)", (json.dumps(state),))
+
+    def acquire_lease(self, owner: str, ttl: float) -> bool:
+        """
+        WordPressからの更新を1つのプロセスだけが行うためのリースを取得（取得済みの場合は延長）します。
+        期限切れのリースは、取得したプロセスが停止したものとみなして奪います。
+
+        Args:
+            owner (str): リースを取得するインデックスの識別子
+            ttl (float): リースの有効期間（秒）
+
+        Returns:
+            bool: 取得できた場合はTrue
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute('BEGIN IMMEDIATE')
+            row = self._conn.execute("SELECT value FROM sync_state WHERE key = 'lease'").fetchone()
+            lease = json.loads(row[0]) if row else None
+            if lease and lease['owner'] != owner and lease['expires_at'] > now:
+                return False
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_state (key, value) VALUES ('lease', ?)",
+                (json.dumps({'owner': owner, 'expires_at': now + ttl}),),
+            )
+            return True
+
+    def release_lease(self, owner: str):
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM sync_state WHERE key = 'lease' AND json_extract(value, '$.owner') = ?",
+                (owner,),
+            )
+
+
+class SimilarityIndex:
+    def __init__(
+        self,
+        store: SignatureStore | None = None,
+        num_perm: int = 128,
+        bands: int = 32,
+        shingle_size: int = 3,
+        status: str = 'publish',
+        refresh_interval: float = 300.0,
+        full_sync_interval: float = 3600.0,
+        max_concurrency: int = 4,
+        html_converter: BaseHtmlConverter | None = None,
+        lease_timeout: float = 60.0,
+        retry_delay: float = 1.0,
+        max_retry_delay: float = 60.0,
+    ):
+        """
+        サイト全体の投稿の類似・重複を検出するインデックス
+
+        投稿本文をテキスト化して文字シングルに分割し、MinHashシグネチャをLSHで索引する。
+        シグネチャはSignatureStoreに保存され、更新（modified）された投稿だけを再計算する。
+        シグネチャの計算に使うパラメータ（num_perm・seed・shingle_size・HTML変換エンジン）も保存し、
+        変更された場合は互換性の無いシグネチャを混在させないよう全件を再計算する。
+        通常の更新はmodified_afterで変更分のみを取得し、削除の検出のためfull_sync_intervalごとに全投稿のIDを照合する。
+
+        ストアを共有する複数のプロセス（ワーカーや類似投稿レポート）では、リースを取得した1つだけがWordPressから取り込み、
+        他のプロセスは更新のたびにストアとの差分をメモリ上のインデックスに反映する。
+        取り込みを始める前にもストアとの差分を反映するので、他のプロセスが保存した投稿を取りこぼさない。
+        サーバーではstart()でバックグラウンドに構築・更新し、初回の構築が終わるまでreadyはFalseになる。
+
+        Args:
+            store (SignatureStore, optional): シグネチャの保存先. Defaults to メモリ上のストア.
+            num_perm (int, optional): シグネチャの長さ. Defaults to 128.
+            bands (int, optional): LSHのバンド数. Defaults to 32.
+            shingle_size (int, optional): シングルの文字数. Defaults to 3.
+            status (str, optional): 対象とする投稿ステータス（カンマ区切り）. Defaults to 'publish'.
+            refresh_interval (float, optional): 変更分を取り込む間隔（秒）. Defaults to 300.0.
+            full_sync_interval (float, optional): 全投稿のIDを照合する間隔（秒）. Defaults to 3600.0.
+            max_concurrency (int, optional): シグネチャを再計算する投稿の同時取得バッチ数. Defaults to 4.
+            html_converter (BaseHtmlConverter, optional): 本文のHTMLをテキストに変換するエンジン. Defaults to 利用可能な最速のエンジン.
+            lease_timeout (float, optional): 取り込み中のプロセスが停止した場合にリースを解放するまでの時間（秒、取り込み中は延長する）.
+                Defaults to 60.0.
+            retry_delay (float, optional): 初回の構築に失敗した場合に再試行するまでの待ち時間（秒、失敗ごとに倍増）. Defaults to 1.0.
+            max_retry_delay (float, optional): 再試行までの待ち時間の上限（秒）. Defaults to 60.0.
+        """
+        self.store = store or SignatureStore()
+        self.hasher = MinHasher(num_perm=num_perm)
+        self.lsh = MinHashLSH(num_perm=num_perm, bands=bands)
+        self.shingle_size = shingle_size
+        self.status = status
+        self.refresh_interval = refresh_interval
+        self.full_sync_interval = full_sync_interval
+        self.max_concurrency = max_concurrency
+        self.html_converter = html_converter if html_converter is not None else get_html_converter()
+        self.lease_timeout = lease_timeout
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self._posts: dict[int, tuple[str, str, str, np.ndarray]] | None = None
+        self._refreshed_at = 0.0
+        self._lock = asyncio.Lock()
+        self._owner = uuid.uuid4().hex
+        self._ready = asyncio.Event()
+        self._refresh_task: asyncio.Task | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    async def start(self, client: WordPressBasicClient):
+        """
+        初回の構築とその後の更新を行うバックグラウンドタスクを開始します（構築の完了は待ちません）。
+
+        Args:
+            client (WordPressBasicClient): 初期化済みのWordPressクライアント
+        """
+        self._refresh_task = asyncio.create_task(self._refresh_loop(client))
+
+    async def wait_ready(self):
+        """
+        初回の構築が完了するまで待ちます。
+        """
+        await self._ready.wait()
+
+    async def stop(self):
+        """
+        バックグラウンドの更新タスクを停止します。
+        """
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+    async def refresh(self, client: WordPressBasicClient, force: bool = False) -> bool:
+        """
+        更新された投稿のシグネチャを再計算し、削除された投稿をインデックスから除きます。
+        他のプロセスがリースを取得して取り込み中の場合は、ストアに保存済みの内容のみを反映します（forceの場合はリースの解放を待ちます）。
+
+        Args:
+            client (WordPressBasicClient): 初期化済みのWordPressクライアント
+            force (bool, optional): 更新間隔に関係なく全投稿を照合するかどうか. Defaults to False.
+
+        Returns:
+            bool: インデックスが全投稿を反映済みの場合はTrue（他のプロセスが初回の構築中の場合はFalse）
+        """
+        async with self._lock:
+            if self._posts is None:
+                await self._load()
+
+            now = time.time()
+            if not force and now - self._refreshed_at < self.refresh_interval:
+                return True
+
+            while not await asyncio.to_thread(self.store.acquire_lease, self._owner, self.lease_timeout):
+                if not force:
+                    state = await self._sync_from_store()
+                    return 'full_synced_at' in state
+                await asyncio.sleep(self.retry_delay)
+            try:
+                # リースの取得前に他のプロセスが保存した投稿を反映してから、共有の同期状態を使って取り込む
+                state = await self._sync_from_store()
+                await self._refresh_from_wordpress(client, state, force, now)
+            finally:
+                await asyncio.to_thread(self.store.release_lease, self._owner)
+            self._refreshed_at = now
+            return True
+
+    async def _refresh_from_wordpress(self, client: WordPressBasicClient, state: dict[str, Any], force: bool, now: float):
+        """
+        WordPressから変更分（または全投稿のID）を取得してストアとインデックスに反映します。リースの取得中に呼び出します。
+
+        Args:
+            client (WordPressBasicClient): 初期化済みのWordPressクライアント
+            state (dict[str, Any]): ストアの同期状態
+            force (bool): 全投稿を照合するかどうか
+            now (float): 更新を開始した時刻
+        """
+        full_sync = force or now - state.get('full_synced_at', 0) >= self.full_sync_interval
+        params = {'status': self.status, '_fields': 'id,modified', 'orderby': 'id', 'order': 'asc'}
+        if not full_sync and state.get('max_modified'):
+            # modified_afterは指定時刻を含まないため、同じ秒に更新された投稿を取りこぼさないよう1秒戻す
+            params['modified_after'] = (datetime.fromisoformat(state['max_modified']) - timedelta(seconds=1)).isoformat()
+
+        listed: dict[int, str] = {}
+        async for page in client.wp_iter_pages('posts', params):
+            listed.update((post['id'], post['modified']) for post in page)
+            await asyncio.to_thread(self.store.acquire_lease, self._owner, self.lease_timeout)
+
+        changed = [
+            post_id for post_id, modified in listed.items() if post_id not in self._posts or self._posts[post_id][0] != modified
+        ]
+        removed = [post_id for post_id in self._posts if post_id not in listed] if full_sync else []
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def update_batch(ids: list[int]):
+            async with semaphore:
+                await self._update_posts(client, ids)
+                await asyncio.to_thread(self.store.acquire_lease, self._owner, self.lease_timeout)
+
+        await gather_or_cancel(*(update_batch(changed[start : start + 100]) for start in range(0, len(changed), 100)))
+        if removed:
+            await asyncio.to_thread(self.store.delete, removed)
+            for post_id in removed:
+                self.lsh.remove(post_id)
+                del self._posts[post_id]
+
+        max_modified = max([state.get('max_modified') or '', *listed.values()])
+        new_state = {**state, 'max_modified': max_modified or None}
+        if full_sync:
+            new_state['full_synced_at'] = now
+        await asyncio.to_thread(self.store.set_state, new_state)
+        logger.info(f'Refreshed similarity index: {len(changed)} updated, {len(removed)} removed, {len(self._posts)} total.')
+
+    @property
+    def signature_params(self) -> dict[str, Any]:
+        """
+        保存済みのシグネチャと互換性があるかの判定に使う、シグネチャの計算パラメータ
+        """
+        return {
+            'num_perm': self.hasher.num_perm,
+            'seed': self.hasher.seed,
+            'shingle_size': self.shingle_size,
+            'html_engine': self.html_converter.name,
+        }
+
+    async def _load(self):
+        """
+        ストアからシグネチャを読み込みます。計算パラメータが保存時と異なる場合は、ストアを空にして作り直します。
+        """
+        state = await asyncio.to_thread(self.store.get_state)
+        if state.get('signature_params') != self.signature_params:
+            if state:
+                logger.warning(
+                    f'Signature parameters changed ({state.get("signature_params")} -> {self.signature_params}), rebuilding the index.'
+                )
+            await asyncio.to_thread(self.store.clear)
+            await asyncio.to_thread(self.store.set_state, {'signature_params': self.signature_params})
+        self._posts = {}
+        await self._sync_from_store()
+        logger.info(f'Loaded {len(self._posts)} signatures from store.')
+
+    async def _sync_from_store(self) -> dict[str, Any]:
+        """
+        他のプロセスがストアに保存・削除した投稿をメモリ上のインデックスに反映します。
+        比較には投稿IDと更新日時のみを読み、差分のある投稿のシグネチャだけを読み込みます。
+
+        Returns:
+            dict[str, Any]: ストアの同期状態
+        """
+        stored = await asyncio.to_thread(self.store.list_modified)
+        changed = [
+            post_id for post_id, modified in stored.items() if post_id not in self._posts or self._posts[post_id][0] != modified
+        ]
+        for post_id in [post_id for post_id in self._posts if post_id not in stored]:
+            self.lsh.remove(post_id)
+            del self._posts[post_id]
+        for post_id, row in (await asyncio.to_thread(self.store.load, changed)).items():
+            self._posts[post_id] = row
+            self.lsh.insert(post_id, row[3])
+        return await asyncio.to_thread(self.store.get_state)
+
+    async def _refresh_loop(self, client: WordPressBasicClient):
+        delay = self.retry_delay
+        while not self.ready:
+            try:
+                if await self.refresh(client):
+                    self._ready.set()
+                    break
+                await asyncio.sleep(self.retry_delay)
+            except Exception as e:
+                logger.warning(f'Failed to build similarity index, retrying in {delay:.1f}s: {str(e)}')
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_retry_delay)
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh(client)
+            except Exception as e:
+                logger.error(f'Failed to refresh similarity index: {str(e)}')
+
+    async def _update_posts(self, client: WordPressBasicClient, ids: list[int]):
+        """
+        指定IDの投稿を取得してシグネチャを計算し、ストアとインデックスに反映します。
+
+        Args:
+            client (WordPressBasicClient): 初期化済みのWordPressクライアント
+            ids (list[int]): 投稿IDのリスト
+        """
+        posts = await client.wp_fetch_posts(
+            params={
+                'include': ','.join(map(str, ids)),
+                'per_page': len(ids),
+                'status': self.status,
+                '_fields': 'id,modified,title,link,content',
+            }
+        )
+        rows = await asyncio.to_thread(self._compute_rows, posts)
+        await asyncio.to_thread(self.store.upsert, rows)
+        for post_id, modified, title, url, signature in rows:
+            self._posts[post_id] = (modified, title, url, signature)
+            self.lsh.insert(post_id, signature)
+
+    def _compute_rows(self, posts: list[dict[str, Any]]) -> list[tuple[int, str, str, str, np.ndarray]]:
+        rows = []
+        for post in posts:
+            text = self.html_converter.convert(post['content']['rendered']) if post.get('content') else ''
+            title = self.html_converter.convert(post['title']['rendered']) if post.get('title') else 'No Title'
+            signature = self.hasher.signature(shingle_hashes(text, k=self.shingle_size))
+            rows.append((post['id'], post['modified'], title, post.get('link', ''), signature))
+        return rows
+
+    def find_similar(self, post_id: int, threshold: float = 0.5, limit: int = 10) -> SimilarPostsResult:
+        """
+        指定投稿に類似する投稿を推定類似度の高い順に取得します。
+
+        Args:
+            post_id (int): 基準とする投稿のID
+            threshold (float, optional): 結果に含める推定Jaccard係数の下限. Defaults to 0.5.
+            limit (int, optional): 結果の最大件数. Defaults to 10.
+
+        Returns:
+            SimilarPostsResult: 類似投稿のリスト
+        """
+        if not self._posts or post_id not in self._posts:
+            raise ValueError(f'Post {post_id} is not in the similarity index (only {self.status} posts are indexed).')
+        signature = self._posts[post_id][3]
+        similar = []
+        for candidate_id in self.lsh.query(signature) - {post_id}:
+            _, title, url, candidate_signature = self._posts[candidate_id]
+            similarity = estimate_similarity(signature, candidate_signature)
+            if similarity >= threshold:
+                similar.append(SimilarPost(id=candidate_id, title=title, url=url, similarity=similarity))
+        similar.sort(key=lambda post: post.similarity, reverse=True)
+        return SimilarPostsResult(post_id=post_id, similar_posts=similar[:limit], count=len(similar[:limit]))
+
+    def report(self, threshold: float = 0.5) -> SimilarityReport:
+        """
+        サイト全体で推定類似度がthreshold以上の投稿の組を列挙します。
+
+        Args:
+            threshold (float, optional): 結果に含める推定Jaccard係数の下限. Defaults to 0.5.
+
+        Returns:
+            SimilarityReport: 類似投稿の組のリスト（類似度の高い順）
+        """
+        posts = self._posts or {}
+        pairs = []
+        for post_id, other_id in self.lsh.candidate_pairs():
+            similarity = estimate_similarity(posts[post_id][3], posts[other_id][3])
+            if similarity >= threshold:
+                pairs.append(
+                    SimilarPostPair(
+                        first=PostReference(id=post_id, title=posts[post_id][1], url=posts[post_id][2]),
+                        second=PostReference(id=other_id, title=posts[other_id][1], url=posts[other_id][2]),
+                        similarity=similarity,
+                    )
+                )
+        pairs.sort(key=lambda pair: pair.similarity, reverse=True)
+        return SimilarityReport(pairs=pairs, count=len(pairs), indexed_posts=len(posts), threshold=threshold)
+
+
+@click.command()
+@click.option('--output', default=None, help='レポートの出力先（JSON、省略時は標準出力）')
+@click.option('--threshold', default=0.5, help='レポートに含める推定類似度の下限（デフォルト: 0.5）')
+@click.option('--signature-path', default='.cache/wp-signatures.sqlite3', help='シグネチャを保存するSQLiteファイルのパス')
+@click.option('--status', default='publish', help='対象とする投稿ステータス（カンマ区切り、デフォルト: publish）')
+@click.option(
+    '--html-engine',
+    default='auto',
+    type=click.Choice(['auto', 'lxml', 'html2text']),
+    help='HTML→テキスト変換エンジン（デフォルト: auto）',
+)
+@click.option('--url', default=env_config.WP_BASE_URL, help='WordPressサイトのベースURL（例: https://example.com）')
+@click.option('--username', default=env_config.WP_USERNAME, help='WordPressのユーザー名')
+@click.option('--app-password', default=env_config.WP_APP_PASSWORD, help='WordPressのアプリパスワード')
+def start_similarity_report(
+    output: str | None,
+    threshold: float,
+    signature_path: str,
+    status: str,
+    html_engine: HtmlEngine,
+    url: str,
+    username: str,
+    app_password: str,
+):
+    """
+    サイト全体の類似・重複投稿のレポートを作成します。
+
+    Args:
+        output (str | None): レポートの出力先
+        threshold (float): レポートに含める推定類似度の下限
+        signature_path (str): シグネチャを保存するSQLiteファイルのパス
+        status (str): 対象とする投稿ステータス
+        html_engine (HtmlEngine): HTML→テキスト変換エンジン
+        url (str): WordPressサイトのベースURL
+        username (str): WordPressのユーザー名
+        app_password (str): WordPressのアプリパスワード
+    """
+
+    async def run() -> SimilarityReport:
+        async with get_wordpress_client(base_url=url, username=username, app_password=app_password) as wp_client:
+            index = SimilarityIndex(
+                store=SignatureStore(signature_path), status=status, html_converter=get_html_converter(html_engine)
+            )
+            await index.refresh(wp_client, force=True)
+            return index.report(threshold=threshold)
+
+    report = asyncio.run(run())
+    if output:
+        Path(output).write_text(report.model_dump_json(indent=2), encoding='utf-8')
+        logger.info(f'Wrote similarity report with {report.count} pairs to {output}')
+    else:
+        click.echo(report.model_dump_json(indent=2))
@@ -1,11 +1,24 @@
 import asyncio
 from datetime import datetime
+from pathlib import Path
 from typing import Any, Dict, List, Literal
 
-import html2text
 from langchain_core.tools import StructuredTool
 
-from src.wordpress.schemas import FetchPostsResult, PostAuthor, PostListQueryParams, PostSchema, WPPreviousPost
+from src.wordpress.cache import BaseCache, InMemoryCache
+from src.wordpress.deadline import gather_or_cancel
+from src.wordpress.html_text import BaseHtmlConverter, get_html_converter
+from src.wordpress.schemas import (
+    FetchPostsResult,
+    MediaSchema,
+    PostAuthor,
+    PostListQueryParams,
+    PostSchema,
+    SimilarPostsResult,
+    UploadMediaResult,
+    WPPreviousPost,
+)
+from src.wordpress.similarity import SimilarityIndex
 from src.wordpress.wp_client import WordPressBasicClient
 
 
@@ -13,20 +26,50 @@ class WordPressToolManager:
     def __init__(
         self,
         client: WordPressBasicClient,
+        cache: BaseCache | None = None,
+        term_cache_ttl: float = 300.0,
+        post_cache_ttl: float = 30.0,
+        similarity_index: SimilarityIndex | None = None,
+        html_converter: BaseHtmlConverter | None = None,
+        media_root: str | Path | None = None,
     ):
         """
         WordPressの投稿管理ツールマネージャー
 
         Args:
             client (WordPressBasicClient): 認証されたWordPressクライアントインスタンス
+            cache (BaseCache, optional): 作成者・カテゴリ・タグ・投稿の読み取りキャッシュ. Defaults to InMemoryCache.
+            term_cache_ttl (float, optional): 作成者・カテゴリ・タグのキャッシュ有効期間（秒）. Defaults to 300.0.
+            post_cache_ttl (float, optional): 投稿のキャッシュ有効期間（秒）. Defaults to 30.0.
+            similarity_index (SimilarityIndex, optional): 類似投稿の検索に使うインデックス（start()で構築を開始しておく）.
+                Defaults to メモリ上のインデックス.
+            html_converter (BaseHtmlConverter, optional): 投稿のHTMLをテキストに変換するエンジン. Defaults to 利用可能な最速のエンジン.
+            media_root (str | Path, optional): upload_media_toolでアップロードを許可するディレクトリ.
+                Defaults to None（アップロード無効）.
         """
         self.client = client
+        self.cache = cache if cache is not None else InMemoryCache()
+        self.term_cache_ttl = term_cache_ttl
+        self.post_cache_ttl = post_cache_ttl
+        self.html_converter = html_converter if html_converter is not None else get_html_converter()
+        self.similarity_index = (
+            similarity_index if similarity_index is not None else SimilarityIndex(html_converter=self.html_converter)
+        )
+        self.media_root = Path(media_root).resolve() if media_root is not None else None
 
     @property
     def dict_tools(
         self,
     ) -> Dict[
-        Literal['fetch_posts_tool', 'get_post_by_id_tool', 'get_post_by_slug_tool', 'create_post_tool', 'delete_post_tool'],
+        Literal[
+            'fetch_posts_tool',
+            'get_post_by_id_tool',
+            'get_post_by_slug_tool',
+            'create_post_tool',
+            'delete_post_tool',
+            'upload_media_tool',
+            'find_similar_posts_tool',
+        ],
         StructuredTool,
     ]:
         """
@@ -61,6 +104,16 @@ class WordPressToolManager:
                 description=self.__doc__,
                 name='delete_post_tool',
             ),
+            'upload_media_tool': StructuredTool.from_function(
+                coroutine=self.upload_media,
+                description=self.__doc__,
+                name='upload_media_tool',
+            ),
+            'find_similar_posts_tool': StructuredTool.from_function(
+                coroutine=self.find_similar_posts,
+                description=self.__doc__,
+                name='find_similar_posts_tool',
+            ),
         }
 
     async def fetch_posts(self, params: PostListQueryParams | dict[str, Any] = None) -> FetchPostsResult:
@@ -82,9 +135,7 @@ class WordPressToolManager:
         elif isinstance(params, dict):
             params = PostListQueryParams.model_validate(params)
         result = await self.client.wp_fetch_posts(params=params.model_dump(exclude_none=True) if params else None)
-
-        tasks = [self._parse_post_data(post) for post in result]
-        posts = await asyncio.gather(*tasks)
+        posts = await self.parse_posts(result)
         return FetchPostsResult(
             posts=posts,
             count=len(posts),
@@ -103,7 +154,10 @@ class WordPressToolManager:
         Returns:
             PostSchema: 取得した投稿データオブジェクト
         """
-        post_data = await self.client.wp_get_post_by_id(post_id)
+        post_data = await self.cache.get('posts', post_id)
+        if post_data is None:
+            post_data = await self.client.wp_get_post_by_id(post_id)
+            await self.cache.set('posts', post_id, post_data, ttl=self.post_cache_ttl)
         return await self._parse_post_data(post_data)
 
     async def get_post_by_slug(self, slug: str) -> PostSchema:
@@ -155,8 +209,88 @@ class WordPressToolManager:
             WPPreviousPost: 削除前の投稿データオブジェクト
         """
         delete_response = await self.client.wp_delete_post(post_id=post_id, force=force)
+        await self.cache.delete('posts', post_id)
         return await self._parse_previous_post(delete_response['previous'])
 
+    async def upload_media(self, file_paths: List[str], max_concurrency: int = 4) -> UploadMediaResult:
+        """
+        ローカルの画像などのファイルをメディアライブラリにアップロードします。
+        アップロードできるのはサーバーに設定されたメディア用ディレクトリ内の通常ファイルのみです（相対パスはそのディレクトリ基準）。
+        ファイルはストリーミングで送信され、複数ファイルは並行してアップロードされます。
+        同じ内容のファイルをこのサーバーがアップロード済みの場合は再送せず、既存のメディアを返します。
+        リライトした投稿に画像を添付する際に役立ちます。
+
+        Args:
+            file_paths (List[str]): アップロードするファイルのパスのリスト
+            max_concurrency (int, optional): 同時アップロード数の上限. Defaults to 4.
+
+        Returns:
+            UploadMediaResult: アップロードしたメディアデータのリスト
+        """
+        paths = [self._resolve_media_path(file_path) for file_path in file_paths]
+        uploaded = await self.client.wp_upload_media_files(paths, max_concurrency=max_concurrency)
+        media = [self._parse_media_data(item) for item in uploaded]
+        return UploadMediaResult(
+            media=media,
+            count=len(media),
+            reused_count=sum(item.reused for item in media),
+        )
+
+    async def find_similar_posts(self, post_id: int, threshold: float = 0.5, limit: int = 10) -> SimilarPostsResult:
+        """
+        指定IDの投稿と本文が重複・類似している投稿を検索します。
+        本文の文字シングルから推定した類似度（0〜1）の高い順に返します。
+        重複記事の統合やリライト候補の選定に役立ちます。
+        インデックスはバックグラウンドで構築・更新され、構築が終わるまではエラーになります。
+
+        Args:
+            post_id (int): 基準とする投稿のID
+            threshold (float, optional): 結果に含める推定類似度の下限. Defaults to 0.5.
+            limit (int, optional): 結果の最大件数. Defaults to 10.
+
+        Returns:
+            SimilarPostsResult: 類似投稿のリスト
+        """
+        if not self.similarity_index.ready:
+            raise RuntimeError('The similarity index is still being built. Try again in a few minutes.')
+        return self.similarity_index.find_similar(post_id, threshold=threshold, limit=limit)
+
+    def _resolve_media_path(self, file_path: str) -> Path:
+        """
+        アップロードするファイルのパスを解決し、メディア用ディレクトリ内の通常ファイルであることを確認します。
+        シンボリックリンクや'..'は解決してから判定するため、ディレクトリの外のファイルは指定できません。
+
+        Args:
+            file_path (str): ファイルのパス（相対パスはメディア用ディレクトリ基準）
+
+        Returns:
+            Path: 解決済みのファイルパス
+        """
+        if self.media_root is None:
+            raise PermissionError('Media upload is disabled. Configure a media root to allow uploads.')
+        path = (self.media_root / file_path).resolve()
+        if not path.is_relative_to(self.media_root):
+            raise PermissionError(f'{file_path} is outside the media root.')
+        if not path.is_file():
+            raise ValueError(f'{file_path} is not a regular file.')
+        return path
+
+    async def parse_posts(self, posts: List[dict[str, Any]]) -> List[PostSchema]:
+        """
+        投稿データの辞書のリストからPostSchemaオブジェクトのリストを生成します。
+        CPU負荷の高いHTMLのテキスト変換はスレッドでまとめて行い、イベントループをブロックしません。
+
+        Args:
+            posts (List[dict]): 投稿データの辞書のリスト
+
+        Returns:
+            List[PostSchema]: postsと同じ順序の投稿データオブジェクトのリスト
+        """
+        if not posts:
+            return []
+        texts = await asyncio.to_thread(lambda: [self._convert_post_text(post) for post in posts])
+        return await gather_or_cancel(*(self._build_post(post, text) for post, text in zip(posts, texts, strict=True)))
+
     async def _resolve_terms(self, term_type: Literal['categories', 'tags'], ids: List[int]) -> List[str]:
         """
         カテゴリまたはタグのIDリストから、それぞれの名前を取得します。
@@ -171,8 +305,14 @@ class WordPressToolManager:
         if not ids:
             return []
 
-        result = await self.client.wp_fetch_items_by_ids(term_type, ids)
-        return [item['name'] for item in result]
+        names = await self.cache.get_many(term_type, ids)
+        missing = [term_id for term_id in ids if str(term_id) not in names]
+        if missing:
+            result = await self.client.wp_fetch_items_by_ids(term_type, missing)
+            fetched = {item['id']: item['name'] for item in result}
+            await self.cache.set_many(term_type, fetched, ttl=self.term_cache_ttl)
+            names.update({str(term_id): name for term_id, name in fetched.items()})
+        return [names[str(term_id)] for term_id in ids if str(term_id) in names]
 
     async def _resolve_author(self, author_id: int) -> PostAuthor:
         """
@@ -184,8 +324,12 @@ class WordPressToolManager:
         Returns:
             PostAuthor: 作成者情報
         """
-        user_data = await self.client.wp_get_user_by_id(author_id)
-        return PostAuthor(id=user_data.get('id'), name=user_data.get('name') or user_data.get('slug') or 'No Name')
+        name = await self.cache.get('users', author_id)
+        if name is None:
+            user_data = await self.client.wp_get_user_by_id(author_id)
+            name = user_data.get('name') or user_data.get('slug') or 'No Name'
+            await self.cache.set('users', author_id, name, ttl=self.term_cache_ttl)
+        return PostAuthor(id=author_id, name=name)
 
     async def _parse_previous_post(self, previous_post: dict[str, Any]) -> WPPreviousPost:
         """
@@ -204,12 +348,30 @@ class WordPressToolManager:
             slug=previous_post['slug'],
             status=previous_post['status'],
             type=previous_post['type'],
-            title=html2text.html2text(previous_post['title']['rendered']).strip() if previous_post.get('title') else 'No Title',
-            content=html2text.html2text(previous_post['content']['rendered']).strip() if previous_post.get('content') else None,
+            title=self.html_converter.convert(previous_post['title']['rendered']) if previous_post.get('title') else 'No Title',
+            content=self.html_converter.convert(previous_post['content']['rendered']) if previous_post.get('content') else None,
             author=author,
             link=previous_post.get('link'),
         )
 
+    def _parse_media_data(self, media: dict[str, Any]) -> MediaSchema:
+        """
+        メディアデータの辞書からMediaSchemaオブジェクトを生成します。
+
+        Args:
+            media (dict): メディアデータの辞書
+
+        Returns:
+            MediaSchema: 解析されたメディアデータオブジェクト
+        """
+        return MediaSchema(
+            id=media['id'],
+            title=self.html_converter.convert(media['title']['rendered']) if media.get('title') else 'No Title',
+            source_url=media['source_url'],
+            mime_type=media.get('mime_type'),
+            reused=media.get('reused', False),
+        )
+
     async def _parse_post_data(self, post: dict[str, Any]) -> PostSchema:
         """
         投稿データの辞書からPostSchemaオブジェクトを生成します。
@@ -220,32 +382,52 @@ class WordPressToolManager:
         Returns:
             PostSchema: 解析された投稿データオブジェクト
         """
-        post_id = post['id']
-        slug = post['slug']
-        title = html2text.html2text(post['title']['rendered']).strip() if post.get('title') else 'No Title'
-        date = datetime.fromisoformat(post['date'])
-        content = html2text.html2text(post['content']['rendered']).strip() if post.get('content') else 'No Content'
-        excerpt = html2text.html2text(post['excerpt']['rendered']).strip() if post.get('excerpt') else 'No Excerpt'
-        url = post['link']
-        status = post['status']
+        return await self._build_post(post, self._convert_post_text(post))
+
+    def _convert_post_text(self, post: dict[str, Any]) -> dict[str, str]:
+        """
+        投稿のタイトル・本文・抜粋のHTMLをテキストに変換します（スレッドから呼び出せます）。
+
+        Args:
+            post (dict): 投稿データの辞書
+
+        Returns:
+            dict[str, str]: 'title', 'content', 'excerpt'をキーとする変換後のテキスト
+        """
+        return {
+            'title': self.html_converter.convert(post['title']['rendered']) if post.get('title') else 'No Title',
+            'content': self.html_converter.convert(post['content']['rendered']) if post.get('content') else 'No Content',
+            'excerpt': self.html_converter.convert(post['excerpt']['rendered']) if post.get('excerpt') else 'No Excerpt',
+        }
 
+    async def _build_post(self, post: dict[str, Any], text: dict[str, str]) -> PostSchema:
+        """
+        投稿データの辞書と変換済みのテキストから、作成者・カテゴリ・タグを解決してPostSchemaオブジェクトを生成します。
+
+        Args:
+            post (dict): 投稿データの辞書
+            text (dict[str, str]): _convert_post_textで変換したテキスト
+
+        Returns:
+            PostSchema: 解析された投稿データオブジェクト
+        """
         resolve_tasks = {
             'author': self._resolve_author(post.get('author')),
             'categories': self._resolve_terms('categories', post.get('categories', [])),
             'tags': self._resolve_terms('tags', post.get('tags', [])),
         }
-        resolved = await asyncio.gather(*resolve_tasks.values())
+        resolved = await gather_or_cancel(*resolve_tasks.values())
         author, categories, tags = resolved
         return PostSchema(
-            id=post_id,
-            slug=slug,
-            title=title,
+            id=post['id'],
+            slug=post['slug'],
+            title=text['title'],
             author=author,
-            date=date,
+            date=datetime.fromisoformat(post['date']),
             categories=categories,
             tags=tags,
-            content=content,
-            excerpt=excerpt,
-            url=url,
-            status=status,
+            content=text['content'],
+            excerpt=text['excerpt'],
+            url=post['link'],
+            status=post['status'],
         )
@@ -0,0 +1,165 @@
+import asyncio
+import os
+import time
+from typing import Literal
+
+from src.utils.logger import get_logger
+from src.wordpress.cache import BaseCache
+from src.wordpress.deadline import gather_or_cancel
+from src.wordpress.wp_client import WordPressBasicClient
+
+logger = get_logger(__name__)
+
+WarmupItemType = Literal['users', 'categories', 'tags']
+
+
+class TermCacheWarmer:
+    def __init__(
+        self,
+        client: WordPressBasicClient,
+        cache: BaseCache,
+        refresh_interval: float = 300.0,
+        max_age: float = 300.0,
+        retry_delay: float = 1.0,
+        max_retry_delay: float = 60.0,
+        lock_timeout: float = 30.0,
+    ):
+        """
+        作成者・カテゴリ・タグの名前をキャッシュに事前読み込みし、バックグラウンドで更新するウォーマー
+
+        WordPressのユーザーとタームには更新日時がないため、更新の要否はX-WP-Totalの件数の変化で判定し、
+        件数が変わらなくても次の確認までにmax_ageを過ぎる場合は名前の変更を反映するため全件を取り直す。
+        名前はmax_ageを有効期間として保存するので、事前読み込みした名前も必要時に取得した名前
+        （WordPressToolManagerのterm_cache_ttl）と同じ時間を超えて古くならない。
+        判定に使う状態とロックはキャッシュ自体に保存するので、SQLiteCacheを共有する複数ワーカーのうち
+        ロックを取得した1つだけが取得を行い、他のワーカーは完了後の状態を見て取得を省略する。
+        ロックは読み込み中に延長し続けるため、読み込み中のワーカーが停止しても他のワーカーはlock_timeout以内に引き継げる。
+
+        Args:
+            client (WordPressBasicClient): 初期化済みのWordPressクライアント
+            cache (BaseCache): 読み込み先のキャッシュ
+            refresh_interval (float, optional): 更新確認の間隔（秒）. Defaults to 300.0.
+            max_age (float, optional): 名前の有効期間（秒、件数が変わらなくてもこれを超える前に全件を取り直す）. Defaults to 300.0.
+            retry_delay (float, optional): 初回の読み込みに失敗した場合に再試行するまでの待ち時間（秒、失敗ごとに倍増）. Defaults to 1.0.
+            max_retry_delay (float, optional): 再試行までの待ち時間の上限（秒）. Defaults to 60.0.
+            lock_timeout (float, optional): 読み込み中のワーカーが停止した場合にロックを解放するまでの時間（秒）. Defaults to 30.0.
+        """
+        self.client = client
+        self.cache = cache
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.lock_timeout = lock_timeout
+        self.item_types: tuple[WarmupItemType, ...] = ('users', 'categories', 'tags')
+        self._ready = asyncio.Event()
+        self._refresh_task: asyncio.Task | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    async def start(self):
+        """
+        初回の読み込みとその後の更新を行うバックグラウンドタスクを開始します（読み込みの完了は待ちません）。
+        """
+        self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def wait_ready(self):
+        """
+        初回の読み込みが完了するまで待ちます。
+        """
+        await self._ready.wait()
+
+    async def stop(self):
+        """
+        バックグラウンドの更新タスクを停止します。
+        """
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+    async def warm(self, force: bool = False) -> bool:
+        """
+        更新が必要なタイプのみ全件を取得してキャッシュに保存します。
+        他のワーカーが読み込み中の場合は何もしません。
+
+        Args:
+            force (bool, optional): 更新判定を行わずに全件を取り直すかどうか. Defaults to False.
+
+        Returns:
+            bool: 読み込みを行った（または不要と判定した）場合はTrue、他のワーカーが読み込み中の場合はFalse
+        """
+        if not await self.cache.add('warmup', 'lock', os.getpid(), ttl=self.lock_timeout):
+            return False
+        renew_task = asyncio.create_task(self._renew_lock())
+        try:
+            await gather_or_cancel(*(self._warm_item_type(item_type, force) for item_type in self.item_types))
+        finally:
+            renew_task.cancel()
+            await self.cache.delete('warmup', 'lock')
+        return True
+
+    async def _renew_lock(self):
+        """
+        読み込みが終わるまで、lock_timeoutの3分の1ごとにロックの有効期間を延長します。
+        """
+        while True:
+            await asyncio.sleep(self.lock_timeout / 3)
+            await self.cache.set('warmup', 'lock', os.getpid(), ttl=self.lock_timeout)
+
+    async def _warm_item_type(self, item_type: WarmupItemType, force: bool):
+        """
+        指定タイプの件数を確認し、変化していれば全件を取得してキャッシュに保存します。
+
+        Args:
+            item_type (WarmupItemType): 読み込むアイテムのタイプ
+            force (bool): 更新判定を行わずに全件を取り直すかどうか
+        """
+        state = await self.cache.get('warmup', item_type) or {}
+        now = time.time()
+        if not force and now - state.get('checked_at', 0) < self.refresh_interval:
+            return
+
+        total = await self.client.wp_count_items(item_type)
+        # 次の確認までに有効期間が切れる場合は、件数が変わらなくても取り直す
+        if not force and total == state.get('total') and now - state.get('loaded_at', 0) + self.refresh_interval < self.max_age:
+            await self.cache.set('warmup', item_type, {**state, 'checked_at': now})
+            return
+
+        fields = 'id,name,slug'
+        items = await self.client.wp_fetch_all(item_type, params={'_fields': fields})
+        names = {item['id']: item.get('name') or item.get('slug') or 'No Name' for item in items}
+        await self.cache.set_many(item_type, names, ttl=self.max_age)
+        await self.cache.set('warmup', item_type, {'total': total, 'checked_at': now, 'loaded_at': now})
+        logger.info(f'Warmed {len(names)} {item_type} into cache.')
+
+    async def _warm_until_ready(self):
+        """
+        初回の読み込みが完了するまで再試行します。
+        失敗した場合は待ち時間を倍増させながら再試行し、他のワーカーが読み込み中の場合はその完了を待ちます。
+        """
+        delay = self.retry_delay
+        while True:
+            try:
+                if await self.warm():
+                    break
+                await asyncio.sleep(self.retry_delay)
+            except Exception as e:
+                logger.warning(f'Failed to warm term cache, retrying in {delay:.1f}s: {str(e)}')
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_retry_delay)
+        self._ready.set()
+
+    async def _refresh_loop(self):
+        await self._warm_until_ready()
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.warm()
+            except Exception as e:
+                logger.error(f'Failed to refresh term cache: {str(e)}')
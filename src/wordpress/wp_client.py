@@ -1,13 +1,28 @@
+import asyncio
+import hashlib
+import mimetypes
+import re
+import time
+from collections import deque
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator, Literal
+from pathlib import Path
+from typing import AsyncGenerator, AsyncIterable, AsyncIterator, Literal
+from urllib.parse import quote
 
 import httpx
 
 from src.config.env_config import env_config
 from src.utils.logger import get_logger
+from src.wordpress.deadline import gather_or_cancel, remaining_time
 
 logger = get_logger(__name__)
 
+_ENDPOINT_ID_PATTERN = re.compile(r'/\d+')
+
+
+class _UploadCancelledError(Exception):
+    """同じ内容のメディアをアップロードしていたタスクがキャンセルされ、待機中のタスクが自分でアップロードし直す必要があることを表す"""
+
 
 class WordPressBasicClient:
     def __init__(
@@ -15,6 +30,9 @@ class WordPressBasicClient:
         base_url: str,
         username: str,
         app_password: str,
+        hedge_percentile: float | None = None,
+        hedge_budget: float = 0.05,
+        transport: httpx.AsyncBaseTransport | None = None,
     ):
         """
         WordPressの基本的なAPIクライアント
@@ -23,6 +41,12 @@ class WordPressBasicClient:
             base_url (str): WordPressサイトのベースURL（例: https://example.com）
             username (str): WordPressのユーザー名
             app_password (str): WordPressのアプリケーションパスワード
+            hedge_percentile (float, optional): GETリクエストがこのパーセンタイル（0〜1）のレイテンシを超えた場合に
+                同じリクエストをもう1つ送信し、先に返ったレスポンスを使う（ヘッジリクエスト）。Noneの場合は無効。
+                レイテンシはエンドポイント（IDを除いたパス）ごとに集計する。
+            hedge_budget (float, optional): ヘッジリクエストを送信できるGETリクエストの割合の上限。
+                WordPressが全体的に遅くなった場合に、ほぼ全てのリクエストが二重に送信されるのを防ぐ。デフォルトは0.05。
+            transport (httpx.AsyncBaseTransport, optional): httpxのトランスポート（テスト用）。デフォルトはNone。
         """
         self.base_url = base_url
         self.username = username
@@ -31,10 +55,20 @@ class WordPressBasicClient:
         self._auth = httpx.BasicAuth(self.username, self.app_password)
         self._time_out = 10.0
         self._client: httpx.AsyncClient | None = None
+        self._upload_chunk_size = 256 * 1024
+        self._media_by_hash: dict[str, dict[str, any]] = {}
+        self._media_inflight: dict[str, asyncio.Future] = {}
+        self.hedge_percentile = hedge_percentile
+        self.hedge_budget = hedge_budget
+        self._hedge_min_samples = 20
+        self._hedge_tokens = 0.0
+        self._max_hedge_tokens = 10.0
+        self._latencies: dict[str, deque[float]] = {}
+        self._transport = transport
 
     async def init_client(self):
         if self._client is None:
-            self._client = httpx.AsyncClient(auth=self._auth, timeout=self._time_out)
+            self._client = httpx.AsyncClient(auth=self._auth, timeout=self._time_out, transport=self._transport)
             logger.info('Initialized httpx.AsyncClient for WordPressBasicClient.')
 
     async def close_client(self):
@@ -60,17 +94,127 @@ class WordPressBasicClient:
         url = f'{self.api_root}/{endpoint}'
         logger.debug('WP %s %s params=%s json=%s', method, url, kwargs.get('params'), kwargs.get('json'))
 
+        # 呼び出し元のツールに期限が設定されている場合は、残り時間をタイムアウトとして使う
+        remaining = remaining_time()
+        if remaining is not None:
+            if remaining <= 0:
+                raise TimeoutError(f'Deadline exceeded before WP {method} {url}')
+            kwargs.setdefault('timeout', min(self._time_out, remaining))
+
         try:
-            response = await self._client.request(method, url, **kwargs)
+            async with asyncio.timeout(remaining):
+                latencies = self._latency_window(method, endpoint)
+                hedge_delay = self._hedge_delay(latencies) if method == 'GET' else None
+                if hedge_delay is not None:
+                    response = await self._hedged_send(url, hedge_delay, latencies, **kwargs)
+                else:
+                    response = await self._send(method, url, latencies, **kwargs)
             response.raise_for_status()
             return response
         except httpx.HTTPStatusError as e:
             logger.error(f'HTTP error occurred: {e.response.status_code} - {e.response.text}')
             raise
+        except TimeoutError:
+            logger.warning(f'Deadline exceeded during WP {method} {url}')
+            raise
         except Exception as e:
             logger.error(f'Unexpected error occurred during request: {str(e)}')
             raise
 
+    def _latency_window(self, method: Literal['GET', 'POST', 'PUT', 'DELETE'], endpoint: str) -> deque[float]:
+        """
+        エンドポイントごとのレイテンシの記録先を取得する
+        /mediaと/users/meのように所要時間が大きく異なるエンドポイントを混ぜないよう、メソッドとIDを除いたパスごとに分ける。
+
+        Args:
+            method (str): HTTPメソッド
+            endpoint (str): APIエンドポイント
+
+        Returns:
+            deque[float]: 直近のレイテンシ（秒）
+        """
+        key = f'{method} {_ENDPOINT_ID_PATTERN.sub("/{id}", endpoint)}'
+        return self._latencies.setdefault(key, deque(maxlen=200))
+
+    async def _send(
+        self, method: Literal['GET', 'POST', 'PUT', 'DELETE'], url: str, latencies: deque[float] | None = None, **kwargs
+    ) -> httpx.Response:
+        """
+        リクエストを送信し、レイテンシを記録する
+        完了前にキャンセルされた場合（ヘッジリクエストが先に完了した場合など）も、それまでの経過時間を記録する。
+        遅いリクエストほどキャンセルされやすいため、完了したものだけを記録するとパーセンタイルが過小になる。
+
+        Args:
+            method (str): HTTPメソッド
+            url (str): リクエストURL
+            latencies (deque[float], optional): レイテンシの記録先。Noneの場合は記録しない。
+            **kwargs: httpxのリクエストに渡す追加パラメータ
+
+        Returns:
+            httpx.Response: レスポンスオブジェクト
+        """
+        started = time.monotonic()
+        try:
+            response = await self._client.request(method, url, **kwargs)
+        except asyncio.CancelledError:
+            if latencies is not None:
+                latencies.append(time.monotonic() - started)
+            raise
+        if latencies is not None:
+            latencies.append(time.monotonic() - started)
+        return response
+
+    def _hedge_delay(self, latencies: deque[float]) -> float | None:
+        """
+        ヘッジリクエストを送信するまでの待ち時間（同じエンドポイントの直近のレイテンシのパーセンタイル）を求める
+
+        Args:
+            latencies (deque[float]): エンドポイントの直近のレイテンシ
+
+        Returns:
+            float | None: 待ち時間（秒）。ヘッジが無効、またはサンプルが不足している場合はNone。
+        """
+        if self.hedge_percentile is None:
+            return None
+        # GETリクエストごとにhedge_budget分のトークンを貯め、ヘッジ1回につき1トークン使う
+        self._hedge_tokens = min(self._hedge_tokens + self.hedge_budget, self._max_hedge_tokens)
+        if len(latencies) < self._hedge_min_samples:
+            return None
+        ordered = sorted(latencies)
+        return ordered[int(self.hedge_percentile * (len(ordered) - 1))]
+
+    async def _hedged_send(self, url: str, delay: float, latencies: deque[float], **kwargs) -> httpx.Response:
+        """
+        GETリクエストを送信し、delay秒以内に完了しなければ同じリクエストをもう1つ送信して先に完了した方を返す
+        ヘッジの予算（hedge_budget）を使い切っている場合は、ヘッジせずに最初のリクエストの完了を待つ。
+        レイテンシは最初のリクエストの分だけを記録する。
+
+        Args:
+            url (str): リクエストURL
+            delay (float): ヘッジリクエストを送信するまでの待ち時間（秒）
+            latencies (deque[float]): 最初のリクエストのレイテンシの記録先
+            **kwargs: httpxのリクエストに渡す追加パラメータ
+
+        Returns:
+            httpx.Response: 先に完了したレスポンスオブジェクト
+        """
+        tasks = {asyncio.create_task(self._send('GET', url, latencies, **kwargs))}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done and self._hedge_tokens >= 1:
+                self._hedge_tokens -= 1
+                logger.debug('WP GET %s exceeded %.3fs, sending hedged request', url, delay)
+                tasks.add(asyncio.create_task(self._send('GET', url, **kwargs)))
+            while True:
+                done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None or not pending:
+                        return task.result()
+                tasks = pending
+        finally:
+            for task in tasks:
+                task.cancel()
+
     async def wp_check_api_access(self) -> httpx.Response:
         """
         WordPress REST APIアクセス確認
@@ -104,6 +248,117 @@ class WordPressBasicClient:
         response = await self._request('GET', item_type, params=params)
         return response.json()
 
+    async def wp_iter_pages(
+        self,
+        item_type: Literal['posts', 'users', 'categories', 'tags'],
+        params: dict[str, any] | None = None,
+        per_page: int = 100,
+        max_concurrency: int = 4,
+        start_page: int = 1,
+    ) -> AsyncIterator[list[dict[str, any]]]:
+        """
+        ページングされた一覧をページ順に1ページずつ返す
+        最初のページのX-WP-TotalPagesヘッダーから総ページ数を求め、最大max_concurrencyページ先まで並行して先読みする。
+        保持するのは先読み中のページだけなので、件数が多くてもメモリ使用量は一定になる。
+
+        Args:
+            item_type (Literal["posts", "users", "categories", "tags"]): 取得するアイテムのタイプ
+            params (dict, optional): クエリパラメータ。デフォルトはNone。
+            per_page (int, optional): 1ページあたりの件数（最大100）。デフォルトは100。
+            max_concurrency (int, optional): 先読みする（同時リクエストする）ページ数の上限。デフォルトは4。
+            start_page (int, optional): 取得を開始するページ番号。デフォルトは1。
+
+        Yields:
+            list[dict]: 1ページ分のアイテムデータのリスト
+        """
+        params = {**(params or {}), 'per_page': per_page}
+        logger.info(f'Fetching all {item_type} from WordPress: params={params}, start_page={start_page}')
+        first_page = await self._request('GET', item_type, params={**params, 'page': start_page})
+        total_pages = int(first_page.headers.get('X-WP-TotalPages', 1))
+        pending: deque[asyncio.Task] = deque()
+        next_page = start_page + 1
+
+        def prefetch():
+            nonlocal next_page
+            while next_page <= total_pages and len(pending) < max_concurrency:
+                pending.append(asyncio.create_task(self._request('GET', item_type, params={**params, 'page': next_page})))
+                next_page += 1
+
+        try:
+            prefetch()
+            yield first_page.json()
+            while pending:
+                response = await pending.popleft()
+                prefetch()
+                yield response.json()
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def wp_fetch_page(
+        self,
+        item_type: Literal['posts', 'users', 'categories', 'tags'],
+        params: dict[str, any] | None = None,
+        page: int = 1,
+        per_page: int = 100,
+    ) -> tuple[list[dict[str, any]], int]:
+        """
+        ページングされた一覧の1ページ分と総ページ数を取得する
+
+        Args:
+            item_type (Literal["posts", "users", "categories", "tags"]): 取得するアイテムのタイプ
+            params (dict, optional): クエリパラメータ。デフォルトはNone。
+            page (int, optional): ページ番号。デフォルトは1。
+            per_page (int, optional): 1ページあたりの件数（最大100）。デフォルトは100。
+
+        Returns:
+            tuple[list[dict], int]: アイテムデータのリストと総ページ数
+        """
+        response = await self._request('GET', item_type, params={**(params or {}), 'page': page, 'per_page': per_page})
+        return response.json(), int(response.headers.get('X-WP-TotalPages', 1))
+
+    async def wp_fetch_all(
+        self,
+        item_type: Literal['posts', 'users', 'categories', 'tags'],
+        params: dict[str, any] | None = None,
+        per_page: int = 100,
+        max_concurrency: int = 4,
+    ) -> list[dict[str, any]]:
+        """
+        ページングされた一覧を全ページ分取得する
+
+        Args:
+            item_type (Literal["posts", "users", "categories", "tags"]): 取得するアイテムのタイプ
+            params (dict, optional): クエリパラメータ。デフォルトはNone。
+            per_page (int, optional): 1ページあたりの件数（最大100）。デフォルトは100。
+            max_concurrency (int, optional): 同時リクエスト数の上限。デフォルトは4。
+
+        Returns:
+            list[dict]: 全ページのアイテムデータのリスト
+        """
+        items = []
+        async for page_items in self.wp_iter_pages(item_type, params, per_page=per_page, max_concurrency=max_concurrency):
+            items.extend(page_items)
+        logger.info(f'Fetched {len(items)} {item_type}.')
+        return items
+
+    async def wp_count_items(
+        self, item_type: Literal['posts', 'users', 'categories', 'tags'], params: dict[str, any] | None = None
+    ) -> int:
+        """
+        アイテムの総数を取得する（X-WP-Totalヘッダーを1件だけのリクエストで取得する）
+
+        Args:
+            item_type (Literal["posts", "users", "categories", "tags"]): 対象アイテムのタイプ
+            params (dict, optional): クエリパラメータ。デフォルトはNone。
+
+        Returns:
+            int: アイテムの総数
+        """
+        response = await self._request('GET', item_type, params={**(params or {}), 'per_page': 1, '_fields': 'id'})
+        return int(response.headers.get('X-WP-Total', len(response.json())))
+
     async def wp_fetch_posts(self, params: dict[str, any] | None = None) -> list[dict[str, any]]:
         """
         投稿一覧を取得する
@@ -116,8 +371,9 @@ class WordPressBasicClient:
         """
         logger.info(f'Fetching posts from WordPress: url={self.api_root}/posts, params={params}')
         response = await self._request('GET', 'posts', params=params if params else {})
-        logger.info(f'Fetched posts: {response.json()}')
-        return response.json()
+        posts = response.json()
+        logger.info(f'Fetched {len(posts)} posts.')
+        return posts
 
     async def wp_get_user_by_id(self, user_id: int) -> dict[str, any]:
         """
@@ -207,16 +463,188 @@ class WordPressBasicClient:
         logger.info(f'Deleted post data: {response.json()}')
         return response.json()
 
+    async def wp_upload_media(
+        self,
+        source: str | Path | AsyncIterable[bytes],
+        filename: str | None = None,
+        mime_type: str | None = None,
+        content_hash: str | None = None,
+        content_length: int | None = None,
+    ) -> dict[str, any]:
+        """
+        メディアファイルをストリーミングでアップロードする
+        ファイル全体をメモリに読み込まず、チャンク単位で /wp/v2/media に送信する。
+        同じ内容（SHA-256）のメディアをこのクライアントがアップロード済みの場合は再送せず、既存のメディアデータを返す。
+        重複判定の記録はプロセス内のみで再起動すると失われ、他のプロセスやWordPress上で直接アップロードされたメディアは対象外。
+        再利用する前にメディアが削除されていないかを確認し、削除されていれば改めてアップロードする。
+
+        Args:
+            source (str | Path | AsyncIterable[bytes]): アップロードするファイルのパス、またはバイト列の非同期イテレータ
+            filename (str, optional): WordPress上のファイル名。sourceがパスの場合は省略可能。
+            mime_type (str, optional): MIMEタイプ。省略時はファイル名から推測する。
+            content_hash (str, optional): 非同期イテレータの内容のSHA-256（16進数）。指定すると送信前に重複判定する。
+            content_length (int, optional): 非同期イテレータの総バイト数。省略時はチャンク転送になる。
+
+        Returns:
+            dict: アップロードされた（または既存の）メディアデータ。重複判定で再利用した場合は'reused'がTrueになる。
+        """
+        if isinstance(source, (str, Path)):
+            path = Path(source)
+            filename = filename or path.name
+            content_hash = content_hash or await self._hash_file(path)
+            content_length = path.stat().st_size
+            body = self._iter_file(path)
+        else:
+            if not filename:
+                raise ValueError('filename is required when uploading from an async byte iterator.')
+            body = source
+
+        if content_hash:
+            while True:
+                if content_hash in self._media_by_hash and await self._media_exists(self._media_by_hash[content_hash]['id']):
+                    logger.info(f"Media '{filename}' already uploaded (sha256={content_hash}), skipping upload.")
+                    return {**self._media_by_hash[content_hash], 'reused': True}
+                self._media_by_hash.pop(content_hash, None)
+                if content_hash not in self._media_inflight:
+                    break
+                logger.info(f"Media '{filename}' is being uploaded by another task (sha256={content_hash}), waiting...")
+                try:
+                    return {**await asyncio.shield(self._media_inflight[content_hash]), 'reused': True}
+                except _UploadCancelledError:
+                    # 先にアップロードしていたタスクのキャンセルはこのタスクに伝えず、改めて自分でアップロードする
+                    logger.info(f"Upload of media '{filename}' by another task was cancelled, retrying.")
+            inflight = asyncio.get_running_loop().create_future()
+            self._media_inflight[content_hash] = inflight
+
+        try:
+            digest = hashlib.sha256()
+
+            async def hashing_body() -> AsyncIterator[bytes]:
+                async for chunk in body:
+                    digest.update(chunk)
+                    yield chunk
+
+            headers = {
+                'Content-Type': mime_type or mimetypes.guess_type(filename)[0] or 'application/octet-stream',
+                'Content-Disposition': self._content_disposition(filename),
+            }
+            if content_length is not None:
+                headers['Content-Length'] = str(content_length)
+
+            logger.info(f"Uploading media '{filename}' to WordPress...")
+            response = await self._request('POST', 'media', content=hashing_body(), headers=headers)
+            media = response.json()
+            content_hash = content_hash or digest.hexdigest()
+            self._media_by_hash[content_hash] = media
+            logger.info(f"Uploaded media '{filename}': id={media.get('id')}, sha256={content_hash}")
+        except BaseException as e:
+            inflight = self._media_inflight.pop(content_hash, None)
+            if inflight is not None:
+                inflight.set_exception(_UploadCancelledError() if isinstance(e, asyncio.CancelledError) else e)
+                inflight.exception()
+            raise
+
+        if content_hash in self._media_inflight:
+            self._media_inflight.pop(content_hash).set_result(media)
+        return {**media, 'reused': False}
+
+    async def wp_upload_media_files(self, paths: list[str | Path], max_concurrency: int = 4) -> list[dict[str, any]]:
+        """
+        複数のメディアファイルを並行してアップロードする
+        同時アップロード数はセマフォで制限され、同じ内容のファイルは1度だけ送信される。
+        いずれかのアップロードが失敗した場合は、残りのアップロードをキャンセルして例外を送出する。
+
+        Args:
+            paths (list[str | Path]): アップロードするファイルパスのリスト
+            max_concurrency (int, optional): 同時アップロード数の上限。デフォルトは4。
+
+        Returns:
+            list[dict]: pathsと同じ順序のメディアデータのリスト
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def upload(path: str | Path) -> dict[str, any]:
+            async with semaphore:
+                return await self.wp_upload_media(path)
+
+        return await gather_or_cancel(*(upload(path) for path in paths))
+
+    async def _media_exists(self, media_id: int) -> bool:
+        """
+        指定IDのメディアが存在するかを確認する
+
+        Args:
+            media_id (int): メディアID
+
+        Returns:
+            bool: 存在する場合はTrue
+        """
+        try:
+            await self._request('GET', f'media/{media_id}', params={'_fields': 'id'})
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code in (404, 410):
+                logger.info(f'Previously uploaded media {media_id} no longer exists, uploading again.')
+                return False
+            raise
+        return True
+
+    async def _iter_file(self, path: Path) -> AsyncIterator[bytes]:
+        """
+        ファイルをチャンク単位で読み込む（読み込みはスレッドで行い、イベントループをブロックしない）
+
+        Args:
+            path (Path): 読み込むファイルのパス
+
+        Yields:
+            bytes: ファイルのチャンク
+        """
+        with path.open('rb') as f:
+            while chunk := await asyncio.to_thread(f.read, self._upload_chunk_size):
+                yield chunk
+
+    async def _hash_file(self, path: Path) -> str:
+        """
+        ファイル内容のSHA-256をストリーミングで計算する
+
+        Args:
+            path (Path): 対象ファイルのパス
+
+        Returns:
+            str: SHA-256の16進数文字列
+        """
+        digest = hashlib.sha256()
+        async for chunk in self._iter_file(path):
+            digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _content_disposition(filename: str) -> str:
+        """
+        アップロード用のContent-Dispositionヘッダー値を生成する（日本語ファイル名はRFC 5987形式で併記）
+
+        Args:
+            filename (str): ファイル名
+
+        Returns:
+            str: Content-Dispositionヘッダー値
+        """
+        ascii_name = filename.encode('ascii', 'ignore').decode().replace('"', '') or 'upload'
+        return f'attachment; filename="{ascii_name}"; filename*=UTF-8\'\'{quote(filename)}'
+
 
 @asynccontextmanager
 async def get_wordpress_client(
     base_url: str,
     username: str,
     app_password: str,
+    hedge_percentile: float | None = None,
 ) -> AsyncGenerator[WordPressBasicClient, None]:
     """
     WordPressBasicClientの非同期コンテキストマネージャー
 
+    Args:
+        hedge_percentile (float, optional): ヘッジリクエストを送信するレイテンシのパーセンタイル。Noneの場合は無効。
+
     Yields:
         WordPressBasicClient: 初期化されたWordPressBasicClientインスタンス
     """
@@ -224,6 +652,7 @@ async def get_wordpress_client(
         base_url=base_url,
         username=username,
         app_password=app_password,
+        hedge_percentile=hedge_percentile,
     )
     await client.init_client()
     try:
@@ -0,0 +1,54 @@
+import pytest
+from src.wordpress.cache import InMemoryCache, SQLiteCache
+
+
+class TestCache:
+    @pytest.fixture(params=['memory', 'sqlite'])
+    def cache(self, request, tmp_path):
+        if request.param == 'memory':
+            return InMemoryCache()
+        return SQLiteCache(tmp_path / 'cache.sqlite3')
+
+    @pytest.mark.asyncio
+    async def test_set_and_get_many(self, cache):
+        await cache.set_many('categories', {1: 'ニュース', 2: 'Python'})
+
+        assert await cache.get_many('categories', [1, 2, 3]) == {'1': 'ニュース', '2': 'Python'}
+        assert await cache.get('categories', 1) == 'ニュース'
+        assert await cache.get('tags', 1) is None
+
+    @pytest.mark.asyncio
+    async def test_expired_and_deleted_values_are_missing(self, cache):
+        await cache.set('posts', 1, {'id': 1}, ttl=-1)
+        await cache.set('posts', 2, {'id': 2})
+        await cache.delete('posts', 2)
+
+        assert await cache.get_many('posts', [1, 2]) == {}
+
+    @pytest.mark.asyncio
+    async def test_add_only_if_missing(self, cache):
+        assert await cache.add('warmup', 'lock', 1, ttl=60) is True
+        assert await cache.add('warmup', 'lock', 2, ttl=60) is False
+        await cache.set('warmup', 'expired', 1, ttl=-1)
+        assert await cache.add('warmup', 'expired', 2) is True
+        assert await cache.get_many('warmup', ['lock', 'expired']) == {'lock': 1, 'expired': 2}
+
+    @pytest.mark.asyncio
+    async def test_sqlite_cache_is_shared_between_instances(self, tmp_path):
+        writer = SQLiteCache(tmp_path / 'cache.sqlite3')
+        reader = SQLiteCache(tmp_path / 'cache.sqlite3')
+        await writer.set('users', 1, 'admin')
+
+        assert await reader.get('users', 1) == 'admin'
+
+    @pytest.mark.asyncio
+    async def test_sqlite_cache_is_private(self, tmp_path):
+        created = SQLiteCache(tmp_path / 'created.sqlite3')
+        await created.set('posts', 1, {'status': 'draft'})
+        existing_path = tmp_path / 'existing.sqlite3'
+        existing_path.touch(mode=0o644)
+        existing = SQLiteCache(existing_path)
+        await existing.set('posts', 1, {'status': 'private'})
+
+        for path in tmp_path.iterdir():
+            assert path.stat().st_mode & 0o777 == 0o600, path.name
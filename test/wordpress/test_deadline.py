@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+from src.wordpress.deadline import deadline, gather_or_cancel, remaining_time
+
+
+class TestDeadline:
+    def test_nested_deadline_keeps_earliest(self):
+        assert remaining_time() is None
+        with deadline(10):
+            with deadline(60):
+                assert remaining_time() <= 10
+            with deadline(1):
+                assert remaining_time() <= 1
+        assert remaining_time() is None
+
+    @pytest.mark.asyncio
+    async def test_deadline_propagates_to_tasks(self):
+        async def child() -> float | None:
+            return remaining_time()
+
+        with deadline(5):
+            remaining = await asyncio.create_task(child())
+        assert remaining is not None and remaining <= 5
+
+    @pytest.mark.asyncio
+    async def test_gather_or_cancel_cancels_siblings_on_failure(self):
+        cancelled = asyncio.Event()
+
+        async def slow():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        async def fail():
+            raise ValueError('upstream failed')
+
+        with pytest.raises(ValueError):
+            await gather_or_cancel(slow(), fail())
+        assert cancelled.is_set()
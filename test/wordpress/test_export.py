@@ -0,0 +1,101 @@
+import json
+
+import httpx
+import pytest
+from click.testing import CliRunner
+from src.config.env_config import env_config
+from src.wordpress.export import PostExporter, start_export
+from src.wordpress.tools.tool_manager import WordPressToolManager
+from src.wordpress.wp_client import WordPressBasicClient, get_wordpress_client
+
+
+class TestPostExporter:
+    @pytest.mark.asyncio
+    async def test_export_jsonl_and_resume(self, tmp_path):
+        output_path = tmp_path / 'posts.jsonl'
+        async with get_wordpress_client(
+            base_url=env_config.WP_BASE_URL,
+            username=env_config.WP_USERNAME,
+            app_password=env_config.WP_APP_PASSWORD,
+        ) as wp_client:
+            exporter = PostExporter(tool_manager=WordPressToolManager(client=wp_client), output_path=output_path, batch_size=2)
+            result = await exporter.export()
+            resumed = await exporter.export()
+
+        lines = output_path.read_text(encoding='utf-8').splitlines()
+        ids = [json.loads(line)['id'] for line in lines]
+        assert result.count == len(lines) > 0
+        assert ids == sorted(ids)
+        assert result.last_id == ids[-1]
+        assert resumed.count == 0
+        assert resumed.last_id == result.last_id
+
+
+class FakeWordPress:
+    def __init__(self, post_count: int):
+        self.post_ids = list(range(1, post_count + 1))
+        self.listing_requests = 0
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith('/users/1'):
+            return httpx.Response(200, json={'id': 1, 'name': 'admin'})
+        params = request.url.params
+        if 'include' in params:
+            ids = [int(post_id) for post_id in params['include'].split(',')]
+            return httpx.Response(200, json=[self._post(post_id) for post_id in ids])
+        self.listing_requests += 1
+        page, per_page = int(params['page']), int(params['per_page'])
+        items = [{'id': post_id} for post_id in self.post_ids[(page - 1) * per_page : page * per_page]]
+        total_pages = -(-len(self.post_ids) // per_page)
+        return httpx.Response(200, json=items, headers={'X-WP-TotalPages': str(total_pages)})
+
+    @staticmethod
+    def _post(post_id: int) -> dict:
+        return {
+            'id': post_id,
+            'slug': f'post-{post_id}',
+            'title': {'rendered': f'投稿{post_id}'},
+            'content': {'rendered': '<p>本文</p>'},
+            'excerpt': {'rendered': '<p>抜粋</p>'},
+            'date': '2025-01-01T00:00:00',
+            'link': f'https://example.com/?p={post_id}',
+            'status': 'publish',
+            'author': 1,
+        }
+
+
+class TestPostExporterResume:
+    @pytest.mark.asyncio
+    async def test_resume_seeks_to_last_exported_page(self, tmp_path):
+        output_path = tmp_path / 'posts.jsonl'
+        output_path.write_text('{"id": 2400}\n', encoding='utf-8')
+        wordpress = FakeWordPress(post_count=2500)
+        client = WordPressBasicClient(
+            base_url='https://example.com',
+            username='user',
+            app_password='app-password',  # noqa: S106
+            transport=httpx.MockTransport(wordpress.handle),
+        )
+        await client.init_client()
+        try:
+            exporter = PostExporter(tool_manager=WordPressToolManager(client=client), output_path=output_path)
+            result = await exporter.export()
+        finally:
+            await client.close_client()
+
+        ids = [json.loads(line)['id'] for line in output_path.read_text(encoding='utf-8').splitlines()]
+        assert ids == list(range(2400, 2501))
+        assert result.count == 100
+        # 25ページを先頭から読み直さず、二分探索の5回と再開位置（1ページ手前）からの2ページのみ
+        assert wordpress.listing_requests == 7
+
+
+class TestPostExporterOptions:
+    @pytest.mark.parametrize('batch_size', [0, 101])
+    def test_rejects_batch_size_out_of_range(self, tmp_path, batch_size: int):
+        with pytest.raises(ValueError):
+            PostExporter(tool_manager=WordPressToolManager(client=None), output_path=tmp_path / 'posts.jsonl', batch_size=batch_size)
+
+        result = CliRunner().invoke(start_export, ['--output', str(tmp_path / 'posts.jsonl'), '--batch-size', str(batch_size)])
+        assert result.exit_code == 2
+        assert '--batch-size' in result.output
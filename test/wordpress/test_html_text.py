@@ -0,0 +1,39 @@
+from pathlib import Path
+
+import pytest
+from src.wordpress.html_text import HTML_CONVERTERS, Html2TextConverter, LxmlHtmlConverter, get_html_converter
+
+GOLDEN_DIR = Path(__file__).parent / 'data' / 'html_text'
+GOLDEN_CASES = sorted(path.stem for path in GOLDEN_DIR.glob('*.html'))
+
+
+class TestHtmlConverter:
+    @pytest.mark.parametrize('engine', list(HTML_CONVERTERS))
+    @pytest.mark.parametrize('case', GOLDEN_CASES)
+    def test_matches_golden(self, engine: str, case: str):
+        if engine == LxmlHtmlConverter.name:
+            pytest.importorskip('lxml')
+        converter = HTML_CONVERTERS[engine]()
+        html_text = (GOLDEN_DIR / f'{case}.html').read_text(encoding='utf-8')
+        expected = (GOLDEN_DIR / f'{case}.md').read_text(encoding='utf-8').rstrip('\n')
+        assert converter.convert(html_text) == expected
+
+    @pytest.mark.parametrize('engine', list(HTML_CONVERTERS))
+    def test_does_not_wrap_long_paragraphs(self, engine: str):
+        if engine == LxmlHtmlConverter.name:
+            pytest.importorskip('lxml')
+        sentence = 'WordPressのREST APIで投稿を取得し、本文をMarkdownに変換してからMCPツールの結果として返します。' * 3
+        paragraph = f'{sentence} See https://developer.wordpress.org/rest-api/reference/posts/ for the full list of parameters.'
+        assert HTML_CONVERTERS[engine]().convert(f'<p>{paragraph}</p>') == paragraph
+
+    def test_lxml_converter_is_reusable(self):
+        pytest.importorskip('lxml')
+        converter = LxmlHtmlConverter()
+        assert converter.convert('<ul><li><strong>未完了') == '* **未完了**'
+        assert converter.convert('<p>次の変換</p>') == '次の変換'
+        assert converter.convert(' \n') == ''
+
+    def test_auto_prefers_lxml(self):
+        pytest.importorskip('lxml')
+        assert isinstance(get_html_converter('auto'), LxmlHtmlConverter)
+        assert isinstance(get_html_converter('html2text'), Html2TextConverter)
@@ -0,0 +1,81 @@
+import asyncio
+import json
+import time
+from pathlib import Path
+
+import pytest
+from src.wordpress.profiling import LoopBlockMonitor, ToolProfiler
+
+
+def busy_tool_body(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+async def busy_tool(seconds: float) -> str:
+    busy_tool_body(seconds)
+    return 'done'
+
+
+class TestToolProfiler:
+    @pytest.mark.asyncio
+    async def test_armed_call_writes_folded_stacks(self, tmp_path: Path):
+        profiler = ToolProfiler(tmp_path, sampling_interval=0.001)
+        profiler.start()
+        tool = profiler.wrap('busy_tool', busy_tool)
+        profiler.arm('busy_tool')
+
+        assert await tool(0.05) == 'done'
+        await profiler.stop()
+
+        [summary_path] = tmp_path.glob('*.json')
+        summary = json.loads(summary_path.read_text(encoding='utf-8'))
+        assert summary['tool'] == 'busy_tool'
+        assert summary['samples'] > 0
+        assert 'busy_tool_body' in (tmp_path / summary['profile']).read_text(encoding='utf-8')
+
+    @pytest.mark.asyncio
+    async def test_unselected_call_is_not_profiled(self, tmp_path: Path):
+        profiler = ToolProfiler(tmp_path, sample_rate=0.0)
+        tool = profiler.wrap('busy_tool', busy_tool)
+
+        assert await tool(0.0) == 'done'
+        await profiler.stop()
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.parametrize('count', [0, -1, 1000])
+    def test_arm_rejects_out_of_range_count(self, tmp_path: Path, count: int):
+        profiler = ToolProfiler(tmp_path, max_armed=10)
+
+        with pytest.raises(ValueError):
+            profiler.arm('busy_tool', count=count)
+        assert profiler.arm('busy_tool', count=10) == {'busy_tool': 10}
+        assert profiler.arm('busy_tool', count=5) == {'busy_tool': 10}
+
+    @pytest.mark.asyncio
+    async def test_block_log_is_written_off_loop_and_rotated(self, tmp_path: Path):
+        profiler = ToolProfiler(tmp_path, max_block_log_bytes=32)
+        for _ in range(3):
+            profiler._record_block(0.2, 'main;busy_tool_body')
+        await profiler.stop()
+
+        log_path = tmp_path / 'loop-blocks.folded'
+        assert log_path.read_text(encoding='utf-8') == 'main;busy_tool_body 200\n'
+        assert log_path.with_name('loop-blocks.folded.1').read_text(encoding='utf-8') == 'main;busy_tool_body 200\n' * 2
+
+
+class TestLoopBlockMonitor:
+    @pytest.mark.asyncio
+    async def test_detects_blocking_callback(self):
+        blocks = []
+        monitor = LoopBlockMonitor(threshold=0.05, on_block=lambda lag, stack: blocks.append(stack))
+        monitor.start()
+        await asyncio.sleep(0.06)
+        busy_tool_body(0.3)
+        await asyncio.sleep(0.06)
+        monitor.stop()
+
+        assert monitor.block_count >= 1
+        assert monitor.blocked_time >= 0.2
+        assert any(stack and 'busy_tool_body' in stack for stack in blocks)
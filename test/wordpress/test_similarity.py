@@ -0,0 +1,184 @@
+import asyncio
+
+import httpx
+import pytest
+from src.wordpress.similarity import MinHasher, MinHashLSH, SignatureStore, SimilarityIndex, estimate_similarity, shingle_hashes
+from src.wordpress.wp_client import WordPressBasicClient
+
+ARTICLE = (
+    'WordPressのREST APIを使って投稿を取得し、カテゴリーやタグの名前を解決してから'
+    'MCPツールとして公開する方法を解説します。アプリケーションパスワードの発行手順も紹介します。'
+)
+
+
+class TestSimilarity:
+    def test_near_duplicate_is_candidate(self):
+        hasher = MinHasher()
+        lsh = MinHashLSH()
+        original = hasher.signature(shingle_hashes(ARTICLE))
+        edited = hasher.signature(shingle_hashes(ARTICLE.replace('解説します', '説明します')))
+        unrelated = hasher.signature(shingle_hashes('今日は晴れていたので、近所の公園まで散歩に出かけました。'))
+        lsh.insert(1, original)
+        lsh.insert(2, unrelated)
+
+        assert estimate_similarity(original, edited) > 0.7
+        assert estimate_similarity(original, unrelated) < 0.2
+        assert lsh.query(edited) == {1}
+
+    def test_remove_drops_candidates(self):
+        hasher = MinHasher()
+        lsh = MinHashLSH()
+        signature = hasher.signature(shingle_hashes(ARTICLE))
+        lsh.insert(1, signature)
+        lsh.insert(2, signature)
+        assert lsh.candidate_pairs() == {(1, 2)}
+
+        lsh.remove(2)
+        assert len(lsh) == 1
+        assert lsh.candidate_pairs() == set()
+
+    def test_empty_signatures_are_not_candidates(self):
+        hasher = MinHasher()
+        lsh = MinHashLSH()
+        empty = hasher.signature(shingle_hashes(''))
+        for post_id in range(200):
+            lsh.insert(post_id, hasher.signature(shingle_hashes(' ＊ --- ・・・ ' if post_id % 2 else '')))
+
+        assert estimate_similarity(empty, empty) == 0.0
+        assert len(lsh) == 0
+        assert lsh.candidate_pairs() == set()
+        assert lsh.query(empty) == set()
+
+
+def wordpress_handler(request: httpx.Request) -> httpx.Response:
+    if 'include' in request.url.params:
+        return httpx.Response(
+            200,
+            json=[
+                {
+                    'id': 1,
+                    'modified': '2025-01-01T00:00:00',
+                    'title': {'rendered': 'タイトル'},
+                    'link': 'https://example.com/?p=1',
+                    'content': {'rendered': f'<p>{ARTICLE}</p>'},
+                }
+            ],
+        )
+    return httpx.Response(200, json=[{'id': 1, 'modified': '2025-01-01T00:00:00'}], headers={'X-WP-TotalPages': '1'})
+
+
+class TestSimilarityIndex:
+    @pytest.mark.asyncio
+    async def test_changed_parameters_rebuild_store(self, tmp_path):
+        client = WordPressBasicClient(
+            base_url='https://example.com',
+            username='user',
+            app_password='app-password',  # noqa: S106
+            transport=httpx.MockTransport(wordpress_handler),
+        )
+        await client.init_client()
+        try:
+            index = SimilarityIndex(store=SignatureStore(tmp_path / 'signatures.sqlite3'))
+            await index.refresh(client)
+            rebuilt = SimilarityIndex(store=SignatureStore(tmp_path / 'signatures.sqlite3'), num_perm=64, bands=16)
+            await rebuilt.refresh(client)
+        finally:
+            await client.close_client()
+
+        assert len(rebuilt._posts[1][3]) == 64
+        assert rebuilt.store.get_state()['signature_params'] == rebuilt.signature_params
+
+
+class FakeWordPressPosts:
+    def __init__(self):
+        self.posts: dict[int, str] = {}
+        self.fetched: list[int] = []
+
+    def add(self, post_id: int, modified: str):
+        self.posts[post_id] = modified
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if 'include' in request.url.params:
+            ids = [int(post_id) for post_id in request.url.params['include'].split(',')]
+            self.fetched.extend(ids)
+            return httpx.Response(
+                200,
+                json=[
+                    {
+                        'id': post_id,
+                        'modified': self.posts[post_id],
+                        'title': {'rendered': f'タイトル{post_id}'},
+                        'link': f'https://example.com/?p={post_id}',
+                        'content': {'rendered': f'<p>{ARTICLE}{post_id}</p>'},
+                    }
+                    for post_id in ids
+                ],
+            )
+        modified_after = request.url.params.get('modified_after')
+        listed = [
+            {'id': post_id, 'modified': modified}
+            for post_id, modified in sorted(self.posts.items())
+            if modified_after is None or modified > modified_after
+        ]
+        return httpx.Response(200, json=listed, headers={'X-WP-TotalPages': '1'})
+
+
+class TestSharedSimilarityStore:
+    @pytest.mark.asyncio
+    async def test_indexes_sharing_a_store_see_each_others_posts(self, tmp_path):
+        wordpress = FakeWordPressPosts()
+        wordpress.add(1, '2025-01-01T00:00:00')
+        client = WordPressBasicClient(
+            base_url='https://example.com',
+            username='user',
+            app_password='app-password',  # noqa: S106
+            transport=httpx.MockTransport(wordpress),
+        )
+        await client.init_client()
+        try:
+            first = SimilarityIndex(store=SignatureStore(tmp_path / 'signatures.sqlite3'), refresh_interval=0)
+            second = SimilarityIndex(store=SignatureStore(tmp_path / 'signatures.sqlite3'), refresh_interval=0)
+            assert await first.refresh(client)
+            assert await second.refresh(client)
+
+            # firstだけが取り込んで共有の同期状態を進めても、secondはストアから投稿を反映する
+            wordpress.add(2, '2025-01-02T00:00:00')
+            await first.refresh(client)
+            wordpress.add(3, '2025-01-03T00:00:00')
+            await first.refresh(client)
+            await second.refresh(client)
+        finally:
+            await client.close_client()
+
+        assert second.find_similar(2).post_id == 2
+        assert sorted(second._posts) == [1, 2, 3]
+        # 本文は各投稿1回だけ取得する
+        assert sorted(wordpress.fetched) == [1, 2, 3]
+
+    @pytest.mark.asyncio
+    async def test_index_waits_for_the_lease_holder(self, tmp_path):
+        wordpress = FakeWordPressPosts()
+        wordpress.add(1, '2025-01-01T00:00:00')
+        client = WordPressBasicClient(
+            base_url='https://example.com',
+            username='user',
+            app_password='app-password',  # noqa: S106
+            transport=httpx.MockTransport(wordpress),
+        )
+        store = SignatureStore(tmp_path / 'signatures.sqlite3')
+        await client.init_client()
+        try:
+            assert store.acquire_lease('other-worker', ttl=60)
+            index = SimilarityIndex(store=SignatureStore(tmp_path / 'signatures.sqlite3'), retry_delay=0.01)
+            await index.start(client)
+            await asyncio.sleep(0.05)
+            assert not index.ready
+            assert wordpress.fetched == []
+
+            store.release_lease('other-worker')
+            await asyncio.wait_for(index.wait_ready(), timeout=5)
+            await index.stop()
+        finally:
+            await client.close_client()
+
+        assert wordpress.fetched == [1]
@@ -0,0 +1,33 @@
+import pytest
+from src.wordpress.tools.tool_manager import WordPressToolManager
+
+
+class TestUploadMediaPaths:
+    @pytest.mark.asyncio
+    async def test_rejects_paths_outside_media_root(self, tmp_path):
+        media_root = tmp_path / 'media'
+        media_root.mkdir()
+        secret = tmp_path / 'secret.env'
+        secret.write_text('WP_APP_PASSWORD=x')
+        (media_root / 'link.gif').symlink_to(secret)
+        tool_manager = WordPressToolManager(client=None, media_root=media_root)
+
+        for file_path in [str(secret), '../secret.env', 'link.gif']:
+            with pytest.raises(PermissionError):
+                await tool_manager.upload_media([file_path])
+        with pytest.raises(ValueError):
+            await tool_manager.upload_media(['.'])
+
+    @pytest.mark.asyncio
+    async def test_upload_disabled_without_media_root(self, tmp_path):
+        image_path = tmp_path / 'image.gif'
+        image_path.write_bytes(b'GIF89a')
+        with pytest.raises(PermissionError):
+            await WordPressToolManager(client=None).upload_media([str(image_path)])
+
+
+class TestFindSimilarPosts:
+    @pytest.mark.asyncio
+    async def test_reports_index_being_built(self):
+        with pytest.raises(RuntimeError, match='still being built'):
+            await WordPressToolManager(client=None).find_similar_posts(1)
@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+from src.config.env_config import env_config
+from src.wordpress.cache import InMemoryCache, SQLiteCache
+from src.wordpress.warmup import TermCacheWarmer
+from src.wordpress.wp_client import get_wordpress_client
+
+
+class TestTermCacheWarmer:
+    @pytest.mark.asyncio
+    async def test_start_warms_terms_and_users(self):
+        cache = InMemoryCache()
+        async with get_wordpress_client(
+            base_url=env_config.WP_BASE_URL,
+            username=env_config.WP_USERNAME,
+            app_password=env_config.WP_APP_PASSWORD,
+        ) as wp_client:
+            warmer = TermCacheWarmer(client=wp_client, cache=cache)
+            await warmer.start()
+            try:
+                await asyncio.wait_for(warmer.wait_ready(), timeout=30)
+                assert warmer.ready
+                categories = await wp_client.wp_fetch_all('categories')
+                cached = await cache.get_many('categories', [category['id'] for category in categories])
+                assert len(cached) == len(categories)
+                assert await cache.get('warmup', 'users') is not None
+            finally:
+                await warmer.stop()
+
+
+class FakeWordPressClient:
+    def __init__(self, failures: int = 0, fetch_delay: float = 0.05):
+        self.failures = failures
+        self.fetch_delay = fetch_delay
+        self.names: dict[str, str] = {}
+        self.fetches = 0
+
+    async def wp_count_items(self, item_type: str) -> int:
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError('WordPress is unreachable')
+        return 1
+
+    async def wp_fetch_all(self, item_type: str, params: dict | None = None) -> list[dict]:
+        await asyncio.sleep(self.fetch_delay)
+        self.fetches += 1
+        return [{'id': 1, 'name': self.names.get(item_type, item_type)}]
+
+
+class TestTermCacheWarmerStartup:
+    @pytest.mark.asyncio
+    async def test_start_does_not_wait_and_retries(self):
+        client = FakeWordPressClient(failures=2)
+        warmer = TermCacheWarmer(client=client, cache=InMemoryCache(), retry_delay=0.01)
+        await warmer.start()
+        try:
+            assert not warmer.ready
+            await asyncio.wait_for(warmer.wait_ready(), timeout=5)
+            assert client.fetches == len(warmer.item_types)
+        finally:
+            await warmer.stop()
+
+    @pytest.mark.asyncio
+    async def test_workers_sharing_cache_fetch_once(self, tmp_path):
+        clients = [FakeWordPressClient(), FakeWordPressClient()]
+        warmers = [
+            TermCacheWarmer(client=client, cache=SQLiteCache(tmp_path / 'cache.sqlite3'), retry_delay=0.01) for client in clients
+        ]
+        for warmer in warmers:
+            await warmer.start()
+        try:
+            await asyncio.wait_for(asyncio.gather(*(warmer.wait_ready() for warmer in warmers)), timeout=5)
+            assert sum(client.fetches for client in clients) == len(warmers[0].item_types)
+        finally:
+            for warmer in warmers:
+                await warmer.stop()
+
+
+class TestTermCacheWarmerFreshness:
+    @pytest.mark.asyncio
+    async def test_renamed_term_is_reloaded_within_max_age(self):
+        client = FakeWordPressClient(fetch_delay=0)
+        cache = InMemoryCache()
+        warmer = TermCacheWarmer(client=client, cache=cache, refresh_interval=0.05, max_age=0.1)
+        await warmer.warm()
+        client.names['categories'] = 'renamed'
+        await asyncio.sleep(0.06)
+        await warmer.warm()
+
+        assert await cache.get('categories', 1) == 'renamed'
+
+    @pytest.mark.asyncio
+    async def test_stale_lock_of_stopped_worker_expires(self):
+        cache = InMemoryCache()
+        await cache.add('warmup', 'lock', 999999, ttl=0.2)
+        warmer = TermCacheWarmer(client=FakeWordPressClient(fetch_delay=0), cache=cache, retry_delay=0.01, lock_timeout=0.2)
+        await warmer.start()
+        try:
+            await asyncio.wait_for(warmer.wait_ready(), timeout=1)
+        finally:
+            await warmer.stop()
+
+    @pytest.mark.asyncio
+    async def test_lock_is_renewed_while_warming(self):
+        cache = InMemoryCache()
+        slow = TermCacheWarmer(client=FakeWordPressClient(fetch_delay=0.5), cache=cache, lock_timeout=0.15)
+        other = TermCacheWarmer(client=FakeWordPressClient(fetch_delay=0), cache=cache, lock_timeout=0.15)
+        warming = asyncio.create_task(slow.warm())
+        await asyncio.sleep(0.3)
+
+        assert await other.warm() is False
+        assert await warming is True
+        assert await other.warm() is True
@@ -0,0 +1,58 @@
+import signal
+import time
+
+import pytest
+import uvicorn
+from src.wordpress.mcp.workers import RollingMultiprocess, notify_ready
+
+
+def ready_after_delay(sockets):
+    time.sleep(0.5)
+    notify_ready()
+    time.sleep(60)
+
+
+def never_ready(sockets):
+    time.sleep(60)
+
+
+class TestRollingMultiprocess:
+    @pytest.fixture
+    def make_supervisor(self):
+        handlers = {sig: signal.getsignal(sig) for sig in (signal.SIGINT, signal.SIGTERM, signal.SIGHUP)}
+        supervisors = []
+
+        def make_supervisor(target, ready_timeout: float) -> RollingMultiprocess:
+            config = uvicorn.Config('src.wordpress.mcp.server:create_server', workers=1, log_config=None)
+            supervisor = RollingMultiprocess(config, target=target, sockets=[], ready_timeout=ready_timeout)
+            supervisors.append(supervisor)
+            supervisor.init_processes()
+            return supervisor
+
+        yield make_supervisor
+        for supervisor in supervisors:
+            supervisor.terminate_all()
+            supervisor.join_all()
+        for sig, handler in handlers.items():
+            signal.signal(sig, handler)
+
+    def test_old_worker_is_stopped_after_new_worker_is_ready(self, make_supervisor):
+        supervisor = make_supervisor(ready_after_delay, ready_timeout=30)
+        [old_process] = supervisor.processes
+
+        started = time.monotonic()
+        supervisor.restart_all()
+
+        assert time.monotonic() - started >= 0.5
+        assert supervisor.processes[0] is not old_process
+        assert supervisor.processes[0].process.is_alive()
+        assert old_process.process.exitcode is not None
+
+    def test_keeps_old_worker_when_new_worker_is_not_ready(self, make_supervisor):
+        supervisor = make_supervisor(never_ready, ready_timeout=1)
+        [old_process] = supervisor.processes
+
+        supervisor.restart_all()
+
+        assert supervisor.processes == [old_process]
+        assert old_process.process.is_alive()
@@ -0,0 +1,231 @@
+import asyncio
+from pathlib import Path
+
+import httpx
+import pytest
+from src.wordpress.deadline import deadline
+from src.wordpress.wp_client import WordPressBasicClient
+
+
+def make_client(handler, **kwargs) -> WordPressBasicClient:
+    return WordPressBasicClient(
+        base_url='https://example.com',
+        username='user',
+        app_password='app-password',  # noqa: S106
+        transport=httpx.MockTransport(handler),
+        **kwargs,
+    )
+
+
+class TestWordPressClientRequest:
+    @pytest.mark.asyncio
+    async def test_timeout_shrinks_to_remaining_deadline(self):
+        timeouts = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            timeouts.append(request.extensions['timeout']['read'])
+            return httpx.Response(200, json=[])
+
+        client = make_client(handler)
+        await client.init_client()
+        try:
+            await client.wp_fetch_posts()
+            with deadline(0.5):
+                await client.wp_fetch_posts()
+        finally:
+            await client.close_client()
+
+        assert timeouts[0] == 10.0
+        assert 0 < timeouts[1] <= 0.5
+
+    @pytest.mark.asyncio
+    async def test_deadline_exceeded_before_request(self):
+        requests = []
+        client = make_client(lambda request: requests.append(request) or httpx.Response(200, json=[]))
+        await client.init_client()
+        try:
+            with deadline(0), pytest.raises(TimeoutError):
+                await client.wp_fetch_posts()
+        finally:
+            await client.close_client()
+
+        assert requests == []
+
+
+class TestHedgedRequest:
+    @pytest.mark.asyncio
+    async def test_slow_get_is_hedged_within_budget(self):
+        calls = 0
+        slow_calls = 0
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal calls, slow_calls
+            calls += 1
+            if request.url.params.get('slug') == 'slow' and calls % 2 == 1:
+                slow_calls += 1
+                await asyncio.sleep(0.3)
+            return httpx.Response(200, json=[{'id': calls}])
+
+        client = make_client(handler, hedge_percentile=0.9, hedge_budget=0.0625)
+        await client.init_client()
+        try:
+            for _ in range(20):
+                await client.wp_get_post_by_slug('fast')
+            calls = 0
+            latencies = client._latencies['GET posts']
+            hedge_delay = sorted(latencies)[int(0.9 * 19)]
+
+            # 21回分の予算（1.3125）でヘッジは1回だけ送信され、2つ目のリクエストが先に返る
+            assert await client.wp_get_post_by_slug('slow') == {'id': 2}
+            await asyncio.sleep(0)
+            assert calls == 2
+            # 記録されるのはキャンセルされた最初のリクエストの経過時間のみ
+            assert len(latencies) == 21
+            assert latencies[-1] >= hedge_delay
+
+            # 予算を使い切った後は遅いリクエストもヘッジしない
+            calls = 0
+            assert await client.wp_get_post_by_slug('slow') == {'id': 1}
+            assert calls == 1
+            assert slow_calls == 2
+        finally:
+            await client.close_client()
+
+    @pytest.mark.asyncio
+    async def test_latencies_are_kept_per_endpoint(self):
+        async def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path.startswith('/wp-json/wp/v2/media/'):
+                await asyncio.sleep(0.05)
+            return httpx.Response(200, json=[])
+
+        client = make_client(handler, hedge_percentile=0.9)
+        await client.init_client()
+        try:
+            for media_id in range(20):
+                await client.wp_fetch_posts()
+                await client._request('GET', f'media/{media_id}')
+        finally:
+            await client.close_client()
+
+        assert set(client._latencies) == {'GET posts', 'GET media/{id}'}
+        assert client._hedge_delay(client._latencies['GET posts']) < 0.05
+        assert client._hedge_delay(client._latencies['GET media/{id}']) >= 0.05
+
+
+class FakeMediaLibrary:
+    def __init__(self, upload_delay: float = 0.0):
+        self.upload_delay = upload_delay
+        self.uploads: list[bytes] = []
+        self.deleted: set[int] = set()
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.method == 'POST':
+            body = await request.aread()
+            await asyncio.sleep(self.upload_delay)
+            self.uploads.append(body)
+            return httpx.Response(201, json={'id': len(self.uploads), 'source_url': f'https://example.com/{len(self.uploads)}.gif'})
+        media_id = int(request.url.path.rsplit('/', 1)[-1])
+        if media_id in self.deleted:
+            return httpx.Response(404, json={'code': 'rest_post_invalid_id'})
+        return httpx.Response(200, json={'id': media_id})
+
+
+class TestUploadMedia:
+    @pytest.fixture
+    def image_path(self, tmp_path) -> Path:
+        image_path = tmp_path / 'image.gif'
+        image_path.write_bytes(b'GIF89a' + bytes(range(256)) * 4096)
+        return image_path
+
+    @pytest.mark.asyncio
+    async def test_concurrent_duplicates_are_uploaded_once(self, tmp_path, image_path: Path):
+        copy_path = tmp_path / 'copy.gif'
+        copy_path.write_bytes(image_path.read_bytes())
+        library = FakeMediaLibrary(upload_delay=0.05)
+        client = make_client(library)
+        await client.init_client()
+        try:
+            media = await client.wp_upload_media_files([image_path, copy_path, image_path])
+        finally:
+            await client.close_client()
+
+        assert library.uploads == [image_path.read_bytes()]
+        assert [item['id'] for item in media] == [1, 1, 1]
+        # 先にハッシュを計算し終えたファイルがアップロードし、残りはその結果を再利用する
+        assert sorted(item['reused'] for item in media) == [False, True, True]
+
+    @pytest.mark.asyncio
+    async def test_reuses_media_that_still_exists(self, image_path: Path):
+        library = FakeMediaLibrary()
+        client = make_client(library)
+        await client.init_client()
+        try:
+            first = await client.wp_upload_media(image_path)
+            second = await client.wp_upload_media(image_path)
+        finally:
+            await client.close_client()
+
+        assert len(library.uploads) == 1
+        assert (first['id'], first['reused']) == (1, False)
+        assert (second['id'], second['reused']) == (1, True)
+
+    @pytest.mark.asyncio
+    async def test_uploads_again_when_media_was_deleted(self, image_path: Path):
+        library = FakeMediaLibrary()
+        client = make_client(library)
+        await client.init_client()
+        try:
+            first = await client.wp_upload_media(image_path)
+            library.deleted.add(first['id'])
+            second = await client.wp_upload_media(image_path)
+        finally:
+            await client.close_client()
+
+        assert len(library.uploads) == 2
+        assert (second['id'], second['reused']) == (2, False)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_upload_does_not_cancel_waiters(self, image_path: Path):
+        library = FakeMediaLibrary(upload_delay=0.1)
+        client = make_client(library)
+        await client.init_client()
+        try:
+            first = asyncio.create_task(client.wp_upload_media(image_path))
+            await asyncio.sleep(0.02)
+            second = asyncio.create_task(client.wp_upload_media(image_path))
+            await asyncio.sleep(0.02)
+            first.cancel()
+            media = await second
+        finally:
+            await client.close_client()
+
+        assert first.cancelled()
+        assert not second.cancelled()
+        assert (media['id'], media['reused']) == (1, False)
+        assert len(library.uploads) == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_upload_cancels_siblings(self, tmp_path, image_path: Path):
+        broken_path = tmp_path / 'broken.gif'
+        broken_path.write_bytes(b'GIF89a')
+        completed = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            body = await request.aread()
+            if body == b'GIF89a':
+                return httpx.Response(500, json={'code': 'rest_upload_unknown_error'})
+            await asyncio.sleep(0.2)
+            completed.append(len(body))
+            return httpx.Response(201, json={'id': 1})
+
+        client = make_client(handler)
+        await client.init_client()
+        try:
+            with pytest.raises(httpx.HTTPStatusError):
+                await client.wp_upload_media_files([image_path, broken_path])
+            # キャンセルされていなければ、この間に残りのアップロードが完了する
+            await asyncio.sleep(0.4)
+        finally:
+            await client.close_client()
+
+        assert completed == []
@@ -1,25 +1,39 @@
+import asyncio
 import logging
-from typing import AsyncGenerator
+import signal
+import socket
+import subprocess
+import sys
+import time
+from collections import deque
+from contextlib import asynccontextmanager, suppress
+from pathlib import Path
+from typing import AsyncGenerator, Iterator
 
+import httpx
 import pytest
 import pytest_asyncio
 from fastmcp.client import Client as MCPClient
+from fastmcp.client.transports import StreamableHttpTransport
 from src.config.env_config import env_config
 from src.utils.logger import get_logger
-from src.wordpress.mcp.server import WordPressMCPServer
-from src.wordpress.schemas import FetchPostsResult, PostSchema, WPPreviousPost
+from src.wordpress.mcp.server import WordPressMCPServer, create_http_app
+from src.wordpress.schemas import FetchPostsResult, PostSchema, UploadMediaResult, WPPreviousPost
+from src.wordpress.wp_client import WordPressBasicClient
+from starlette.testclient import TestClient
 
 logger = get_logger(__name__)
 logger.setLevel(logging.DEBUG)
 
 
 @pytest.fixture
-def wp_mcp_server() -> WordPressMCPServer:
+def wp_mcp_server(tmp_path) -> WordPressMCPServer:
     return WordPressMCPServer(
         base_url=env_config.WP_BASE_URL,
         username=env_config.WP_USERNAME,
         app_password=env_config.WP_APP_PASSWORD,
         transport='stdio',
+        media_root=str(tmp_path),
     )
 
 
@@ -93,3 +107,165 @@ class TestWordPressMCPServer:
         logger.debug('Deleted PostSchema: %s', delete_result)
         assert isinstance(delete_result, WPPreviousPost)
         assert delete_result.id == post_result.id
+
+    @pytest.mark.asyncio
+    async def test_upload_media_tool(self, wp_mcp_client: MCPClient, tmp_path):
+        image_path = tmp_path / 'test-image.gif'
+        image_path.write_bytes(
+            b'GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff!\xf9\x04\x01\x00\x00\x00\x00,\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;'
+        )
+        duplicate_path = tmp_path / 'test-image-copy.gif'
+        duplicate_path.write_bytes(image_path.read_bytes())
+
+        tool_response = await wp_mcp_client.call_tool(
+            'upload_media_tool', {'file_paths': [str(image_path), str(duplicate_path)], 'max_concurrency': 2}
+        )
+        upload_result = UploadMediaResult.model_validate(tool_response.structured_content)
+        logger.debug('UploadMediaResult: %s', upload_result)
+        assert upload_result.count == 2
+        assert upload_result.reused_count == 1
+        assert upload_result.media[0].id == upload_result.media[1].id
+
+
+class TestMultiWorkerServer:
+    @pytest.fixture
+    def worker_server_url(self) -> Iterator[str]:
+        with socket.socket() as sock:
+            sock.bind(('localhost', 0))
+            port = sock.getsockname()[1]
+        process = subprocess.Popen(
+            [
+                sys.executable,
+                '-c',
+                'from src.wordpress.mcp.server import start_server; start_server()',
+                *('--port', str(port), '--workers', '2'),
+            ],
+            cwd=Path(__file__).parents[2],
+        )
+        try:
+            for _ in range(100):
+                try:
+                    if httpx.get(f'http://localhost:{port}/ready').status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.1)
+            yield f'http://localhost:{port}/mcp'
+        finally:
+            process.send_signal(signal.SIGINT)
+            process.wait(timeout=30)
+
+    @pytest.mark.asyncio
+    async def test_sessions_work_across_workers(self, worker_server_url: str):
+        def new_connection_per_request(**kwargs) -> httpx.AsyncClient:
+            # 同じワーカーへの接続が使い回されないよう、リクエストごとに接続し直す
+            return httpx.AsyncClient(follow_redirects=True, limits=httpx.Limits(max_keepalive_connections=0), **kwargs)
+
+        async def use_session() -> int:
+            transport = StreamableHttpTransport(worker_server_url, httpx_client_factory=new_connection_per_request)
+            async with MCPClient(transport, timeout=10) as client:
+                for _ in range(3):
+                    assert await client.ping() is True
+                return len(await client.list_tools())
+
+        tool_counts = await asyncio.gather(*(use_session() for _ in range(6)))
+        assert len(set(tool_counts)) == 1
+        assert tool_counts[0] > 0
+
+    def test_rejects_sse_with_workers(self):
+        server = WordPressMCPServer(
+            base_url=env_config.WP_BASE_URL,
+            username=env_config.WP_USERNAME,
+            app_password=env_config.WP_APP_PASSWORD,
+            transport='sse',
+            workers=2,
+        )
+        with pytest.raises(ValueError):
+            server.run_workers()
+
+
+class TestProfileEndpoint:
+    def make_client(self, tmp_path: Path, profile_token: str | None) -> TestClient:
+        app = create_http_app(
+            base_url=env_config.WP_BASE_URL,
+            username=env_config.WP_USERNAME,
+            app_password=env_config.WP_APP_PASSWORD,
+            profile_dir=str(tmp_path),
+            profile_token=profile_token,
+        )
+        return TestClient(app)
+
+    def test_requires_token(self, tmp_path: Path):
+        client = self.make_client(tmp_path, 'secret')
+
+        assert client.post('/profile').status_code == 401
+        assert client.post('/profile', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+        response = client.post('/profile?tool=fetch_posts_tool&count=3', headers={'Authorization': 'Bearer secret'})
+        assert response.status_code == 200
+        assert response.json()['armed'] == {'fetch_posts_tool': 3}
+
+    @pytest.mark.parametrize('count', ['-1', '0', '1000', 'many'])
+    def test_rejects_invalid_count(self, tmp_path: Path, count: str):
+        client = self.make_client(tmp_path, 'secret')
+
+        response = client.post(f'/profile?count={count}', headers={'Authorization': 'Bearer secret'})
+        assert response.status_code == 400
+
+    def test_disabled_without_token(self, tmp_path: Path):
+        client = self.make_client(tmp_path, None)
+
+        assert client.post('/profile').status_code == 404
+
+
+class TestToolCancellation:
+    @pytest.mark.asyncio
+    async def test_cancelling_tool_call_cancels_hedged_requests(self, monkeypatch):
+        started = []
+        cancelled = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.params.get('slug') != 'slow':
+                return httpx.Response(200, json=[], headers={'X-WP-TotalPages': '1'})
+            started.append(request)
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(request)
+                raise
+            return httpx.Response(200, json=[])
+
+        @asynccontextmanager
+        async def mock_wordpress_client(**kwargs):
+            client = WordPressBasicClient(**kwargs, transport=httpx.MockTransport(handler))
+            await client.init_client()
+            try:
+                yield client
+            finally:
+                await client.close_client()
+
+        async def wait_for(condition):
+            async with asyncio.timeout(5):
+                while not condition():
+                    await asyncio.sleep(0.01)
+
+        monkeypatch.setattr('src.wordpress.mcp.server.get_wordpress_client', mock_wordpress_client)
+        server = WordPressMCPServer(
+            base_url='https://example.com',
+            username='user',
+            app_password='app-password',  # noqa: S106
+            transport='stdio',
+            hedge_percentile=0.5,
+        )
+        async with MCPClient(server.mcp) as client:
+            wp_client = server.tool_manager.client
+            wp_client._latencies['GET posts'] = deque([0.001] * 20, maxlen=200)
+            wp_client._hedge_tokens = 10.0
+
+            call = asyncio.create_task(client.call_tool('get_post_by_slug_tool', {'slug': 'slow'}))
+            await wait_for(lambda: len(started) == 2)
+            await client.cancel(client.session._request_id - 1)
+            await wait_for(lambda: len(cancelled) == 2)
+
+            call.cancel()
+            with suppress(BaseException):
+                await call